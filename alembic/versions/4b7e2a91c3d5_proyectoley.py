@@ -0,0 +1,47 @@
+"""proyectoley
+
+Revision ID: 4b7e2a91c3d5
+Revises: c68a39404b72
+Create Date: 2026-10-18 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2a91c3d5'
+down_revision: Union[str, Sequence[str], None] = 'c68a39404b72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('proyectoley',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('numero', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('titulo', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('estado', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('enlace', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('first_seen_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('proyectoley', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_proyectoley_numero'), ['numero'], unique=True)
+        batch_op.create_index(batch_op.f('ix_proyectoley_estado'), ['estado'], unique=False)
+        batch_op.create_index(batch_op.f('ix_proyectoley_first_seen_at'), ['first_seen_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('proyectoley', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_proyectoley_first_seen_at'))
+        batch_op.drop_index(batch_op.f('ix_proyectoley_estado'))
+        batch_op.drop_index(batch_op.f('ix_proyectoley_numero'))
+
+    op.drop_table('proyectoley')
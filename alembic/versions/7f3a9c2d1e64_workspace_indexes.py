@@ -0,0 +1,35 @@
+"""workspace indexes
+
+Revision ID: 7f3a9c2d1e64
+Revises: 9d3c5e17a2f8
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a9c2d1e64'
+down_revision: Union[str, Sequence[str], None] = '9d3c5e17a2f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Listado de notebooks: WHERE workspace_id = ? ORDER BY updated_at DESC, id DESC
+    op.create_index('ix_notebook_workspace_id_updated_at', 'notebook', ['workspace_id', sa.text('updated_at DESC'), sa.text('id DESC')], unique=False)
+    # Listado de transcripciones: WHERE workspace_id = ? ORDER BY created_at DESC
+    op.create_index('ix_audiotranscription_workspace_id_created_at', 'audiotranscription', ['workspace_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    # delete_notebook y el join de _fetch_user_transcriptions_data
+    op.create_index('ix_audiotranscription_notebook_id', 'audiotranscription', ['notebook_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audiotranscription_notebook_id', table_name='audiotranscription')
+    op.drop_index('ix_audiotranscription_workspace_id_created_at', table_name='audiotranscription')
+    op.drop_index('ix_notebook_workspace_id_updated_at', table_name='notebook')
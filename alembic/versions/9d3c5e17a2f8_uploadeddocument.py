@@ -0,0 +1,45 @@
+"""uploadeddocument
+
+Revision ID: 9d3c5e17a2f8
+Revises: 4b7e2a91c3d5
+Create Date: 2026-10-18 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3c5e17a2f8'
+down_revision: Union[str, Sequence[str], None] = '4b7e2a91c3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('uploadeddocument',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('extracted_text', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('openai_file_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('uploadeddocument', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_uploadeddocument_content_hash'), ['content_hash'], unique=True)
+        batch_op.create_index(batch_op.f('ix_uploadeddocument_openai_file_id'), ['openai_file_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('uploadeddocument', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_uploadeddocument_openai_file_id'))
+        batch_op.drop_index(batch_op.f('ix_uploadeddocument_content_hash'))
+
+    op.drop_table('uploadeddocument')
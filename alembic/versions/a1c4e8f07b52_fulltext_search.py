@@ -0,0 +1,69 @@
+"""fulltext search
+
+Revision ID: a1c4e8f07b52
+Revises: 7f3a9c2d1e64
+Create Date: 2026-10-18 17:05:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c4e8f07b52'
+down_revision: Union[str, Sequence[str], None] = '7f3a9c2d1e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# El contenido de los notebooks es JSON de celdas: los escapes \n, \t, \" se
+# vuelven espacios para que no se peguen a la palabra siguiente ("\nTexto").
+_NOTEBOOK_SEARCH_VECTOR = r"""
+    setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('spanish', regexp_replace(coalesce(content, ''), '\\[nrt"]', ' ', 'g')), 'B')
+"""
+_TRANSCRIPTION_SEARCH_VECTOR = """
+    setweight(to_tsvector('spanish', coalesce(filename, '')), 'A') ||
+    setweight(to_tsvector('spanish', coalesce(transcription_text, '')), 'B')
+"""
+
+
+def _unescape_notebook_json(bind) -> None:
+    """Reescribe el JSON con ensure_ascii=False: "art\\u00edculo" -> "artículo"."""
+    ids = [row[0] for row in bind.execute(sa.text("SELECT id FROM notebook")).fetchall()]
+    for start in range(0, len(ids), 200):
+        batch = ids[start : start + 200]
+        rows = bind.execute(sa.text("SELECT id, content FROM notebook WHERE id IN :ids").bindparams(sa.bindparam("ids", expanding=True)), {"ids": batch}).fetchall()
+        for notebook_id, content in rows:
+            if not content or "\\u" not in content or not content.lstrip().startswith("{"):
+                continue
+            try:
+                rewritten = json.dumps(json.loads(content), ensure_ascii=False)
+            except ValueError:
+                continue
+            bind.execute(sa.text("UPDATE notebook SET content = :content WHERE id = :id"), {"content": rewritten, "id": notebook_id})
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    _unescape_notebook_json(bind)
+    if bind.dialect.name != "postgresql":
+        # SQLite (dev): la búsqueda usa LIKE, no hay tsvector
+        return
+    op.execute(f"ALTER TABLE notebook ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({_NOTEBOOK_SEARCH_VECTOR}) STORED")
+    op.execute(f"ALTER TABLE audiotranscription ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({_TRANSCRIPTION_SEARCH_VECTOR}) STORED")
+    op.create_index('ix_notebook_search_vector', 'notebook', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_audiotranscription_search_vector', 'audiotranscription', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index('ix_audiotranscription_search_vector', table_name='audiotranscription')
+    op.drop_index('ix_notebook_search_vector', table_name='notebook')
+    op.drop_column('audiotranscription', 'search_vector')
+    op.drop_column('notebook', 'search_vector')
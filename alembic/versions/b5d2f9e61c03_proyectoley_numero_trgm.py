@@ -0,0 +1,64 @@
+"""proyectoley numero sort and trigram search
+
+Revision ID: b5d2f9e61c03
+Revises: a1c4e8f07b52
+Create Date: 2026-10-18 19:20:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f9e61c03'
+down_revision: Union[str, Sequence[str], None] = 'a1c4e8f07b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia de `proyectos_sync.numero_sort_key` (la migración no importa la app)
+_NUMERO_RE = re.compile(r"(\d{1,6})\s*(?:/|de)\s*(\d{2,4})", re.IGNORECASE)
+
+
+def _numero_sort_key(numero: str):
+    match = _NUMERO_RE.search(numero or "")
+    if not match:
+        return 0, 0
+    year = int(match.group(2))
+    if year < 100:
+        year += 2000
+    return year, int(match.group(1))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('proyectoley', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('numero_anio', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('numero_orden', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index('ix_proyectoley_numero_anio_orden', ['numero_anio', 'numero_orden'], unique=False)
+
+    bind = op.get_bind()
+    for row_id, numero in bind.execute(sa.text("SELECT id, numero FROM proyectoley")).fetchall():
+        anio, orden = _numero_sort_key(numero)
+        if anio or orden:
+            bind.execute(sa.text("UPDATE proyectoley SET numero_anio = :anio, numero_orden = :orden WHERE id = :id"), {"anio": anio, "orden": orden, "id": row_id})
+
+    if bind.dialect.name != "postgresql":
+        # SQLite (dev): el ILIKE recorre la tabla
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_proyectoley_titulo_trgm', 'proyectoley', ['titulo'], unique=False, postgresql_using='gin', postgresql_ops={'titulo': 'gin_trgm_ops'})
+    op.create_index('ix_proyectoley_numero_trgm', 'proyectoley', ['numero'], unique=False, postgresql_using='gin', postgresql_ops={'numero': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_proyectoley_numero_trgm', table_name='proyectoley')
+        op.drop_index('ix_proyectoley_titulo_trgm', table_name='proyectoley')
+    with op.batch_alter_table('proyectoley', schema=None) as batch_op:
+        batch_op.drop_index('ix_proyectoley_numero_anio_orden')
+        batch_op.drop_column('numero_orden')
+        batch_op.drop_column('numero_anio')
@@ -7,7 +7,11 @@ import reflex as rx
 from .auth_config import lauth
 from dotenv import load_dotenv
 
+from asistente_legal_constitucional_con_ia.services.extraction_executor import extraction_executor_lifespan
+from asistente_legal_constitucional_con_ia.services.openai_client import openai_clients_lifespan
+from asistente_legal_constitucional_con_ia.services.proyectos_sync import proyectos_sync_loop
 from asistente_legal_constitucional_con_ia.states.chat_state import ChatState
+from asistente_legal_constitucional_con_ia.util.scraper import scraper_http_lifespan
 
 from .components.layout import main_layout
 from .pages.asistente_page import asistente_page
@@ -38,6 +42,12 @@ app = rx.App(
     ],
 )
 
+# Cerrar los pools HTTP compartidos (OpenAI y scraper de la Cámara) al apagar el backend.
+app.register_lifespan_task(openai_clients_lifespan)
+app.register_lifespan_task(scraper_http_lifespan)
+app.register_lifespan_task(proyectos_sync_loop)
+app.register_lifespan_task(extraction_executor_lifespan)
+
 # ✅ AÑADIR: Función para crear layout SIN sidebar (usuarios no autenticados)
 
 
@@ -215,7 +225,7 @@ def create_protected_page(page_func, title: str):
 # ✅ MODIFICAR: Aplicar protección a todas las páginas except index
 app.add_page(create_protected_page(asistente_page, "Asistente Constitucional"), route="/asistente", title="Asistente Constitucional")
 
-app.add_page(create_protected_page(proyectos_page, "Proyectos de Ley"), route="/proyectos", title="Proyectos de Ley", on_load=ProyectosState.scrape_proyectos)
+app.add_page(create_protected_page(proyectos_page, "Proyectos de Ley"), route="/proyectos", title="Proyectos de Ley", on_load=ProyectosState.cargar_proyectos)
 
 app.add_page(create_protected_page(prompts_page, "Biblioteca de Prompts"), route="/prompts", title="Biblioteca de Prompts")
 
@@ -91,6 +91,26 @@ def message_bubble(message: rx.Var[dict]) -> rx.Component:
     )
 
 
+def streaming_bubble() -> rx.Component:
+    """Burbuja en vivo: el texto llega como fragmentos que el cliente concatena."""
+    return rx.box(
+        rx.cond(
+            ChatState.streaming_response != "",
+            rx.text(ChatState.streaming_response, size="2", color="gray", white_space="pre-wrap"),
+        ),
+        # Buffer append-only: append_stream_fragment agrega nodos de texto aquí
+        rx.box(id="chat-stream-buffer", white_space="pre-wrap", word_break="break-word"),
+        padding_x="1em",
+        padding_y="0.75em",
+        margin_left="2.75rem",
+        margin_bottom="0.75rem",
+        border_radius="var(--radius-4)",
+        bg="#d3dff8",
+        max_width="90%",
+        min_width="0",
+    )
+
+
 # Versión que funcionaba localmente, restaurada como punto de partida.
 # Usa rx.el.textarea con enter_key_submit y el wrapper rx.box.
 
@@ -166,6 +186,7 @@ def chat_area() -> rx.Component:
         token_meter(),
         rx.box(
             rx.foreach(ChatState.messages, message_bubble),
+            rx.cond(ChatState.streaming, streaming_bubble()),
             id="chat-messages-container",
             padding_x="0.5rem",
             padding_y="1rem",
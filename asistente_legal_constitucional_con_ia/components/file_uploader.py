@@ -2,15 +2,29 @@
 
 import reflex as rx
 
-from ..states.chat_state import ChatState
+from ..services.upload_pipeline import UPLOAD_MAX_BYTES
+from ..states.chat_state import MAX_FILES, ChatState
 
 # Constantes de diseño
-MAX_FILES = 2
 SUPPORTED_TYPES = ["pdf", "docx", "txt"]
 ACCENT_COLOR = "indigo"
 INFO_TEXT_COLOR = "gray"
 
 
+def upload_status_row(status) -> rx.Component:
+    """Progreso de un archivo dentro del lote en curso."""
+    return rx.vstack(
+        rx.hstack(
+            rx.text(status["filename"], size="1", weight="medium", overflow="hidden", text_overflow="ellipsis", white_space="nowrap", flex="1"),
+            rx.text(status["stage"], size="1", color=INFO_TEXT_COLOR),
+            width="100%",
+        ),
+        rx.progress(value=status["progress"], size="1", width="100%", color_scheme=ACCENT_COLOR),
+        spacing="1",
+        width="100%",
+    )
+
+
 def file_uploader() -> rx.Component:
     """Renderiza un widget de subida de archivos."""
     selected_files_var = rx.selected_files("sidebar_upload")
@@ -38,7 +52,7 @@ def file_uploader() -> rx.Component:
         rx.vstack(
             rx.upload(
                 rx.button(
-                    "Subir Archivo",
+                    "Subir Archivos",
                     color_scheme=ACCENT_COLOR,
                     size="2",
                     variant="soft",
@@ -59,7 +73,9 @@ def file_uploader() -> rx.Component:
                     "application/vnd.openxmlformats-officedocument." "wordprocessingml.document": [".docx"],
                     "text/plain": [".txt"],
                 },
-                multiple=False,
+                multiple=True,
+                max_files=files_available_count,
+                max_size=UPLOAD_MAX_BYTES,
                 disabled=~can_upload | is_processing_file,
             ),
             rx.button(
@@ -68,7 +84,7 @@ def file_uploader() -> rx.Component:
                     rx.spinner(size="2", color_scheme="white"),
                     rx.icon("play", size=16),
                 ),
-                "Procesar Archivo",
+                "Procesar Archivos",
                 width="100%",
                 size="2",
                 variant="solid",
@@ -99,17 +115,23 @@ def file_uploader() -> rx.Component:
                 ),
                 rx.cond(
                     ChatState.uploading,
-                    rx.text(
-                        "Procesando archivo...",
-                        size="2",
-                        weight="medium",
+                    rx.vstack(
+                        rx.text(
+                            "Procesando archivos...",
+                            size="2",
+                            weight="medium",
+                        ),
+                        rx.foreach(ChatState.upload_files_status, upload_status_row),
+                        rx.progress(value=ChatState.upload_progress, width="100%", color_scheme=ACCENT_COLOR),
+                        spacing="2",
+                        width="100%",
                         padding_y="0.5em",
                     ),
                     rx.vstack(
                         rx.text(
                             rx.cond(
                                 has_selected_files,
-                                f"Listo: {selected_files_var[0]}",
+                                f"Listo: {selected_files_var.join(', ')}",
                                 "Selecciona un archivo para procesar.",
                             ),
                             size="2",
@@ -4,6 +4,51 @@ from datetime import datetime
 from typing import Optional
 
 import reflex as rx
+import sqlalchemy as sa
+from reflex.config import get_config
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import Field
+
+# Búsqueda de texto completo (migración a1c4e8f07b52): columnas `search_vector` generadas
+# con las mismas expresiones que la migración, e índices GIN. Solo existen en Postgres.
+_NOTEBOOK_SEARCH_VECTOR = r"""
+    setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('spanish', regexp_replace(coalesce(content, ''), '\\[nrt"]', ' ', 'g')), 'B')
+"""
+_TRANSCRIPTION_SEARCH_VECTOR = """
+    setweight(to_tsvector('spanish', coalesce(filename, '')), 'A') ||
+    setweight(to_tsvector('spanish', coalesce(transcription_text, '')), 'B')
+"""
+
+
+def _uses_postgres() -> bool:
+    try:
+        return (get_config().db_url or "").startswith("postgresql")
+    except Exception:
+        return False
+
+
+def _search_vector_args(table: str, expression: str) -> tuple:
+    """Columna `search_vector` e índice GIN para `__table_args__`.
+
+    Se declaran en el metadata para que el autogenerate de migraciones no los borre;
+    `exclude_properties` los deja fuera del mapeo, así los SELECT del ORM no leen el
+    tsvector. En SQLite (dev) no se declaran: la migración tampoco los crea.
+    """
+    if not _uses_postgres():
+        return ()
+    return (
+        sa.Column("search_vector", TSVECTOR, sa.Computed(expression, persisted=True)),
+        sa.Index(f"ix_{table}_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+def _trigram_index_args(table: str, *columns: str) -> tuple:
+    """Índices GIN pg_trgm para los `ILIKE '%término%'` de la búsqueda (solo Postgres, como `search_vector`)."""
+    if not _uses_postgres():
+        return ()
+    return tuple(sa.Index(f"ix_{table}_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}) for column in columns)
+
 
 # CAMBIO 1: SQLModel → rx.Model
 
@@ -11,6 +56,13 @@ import reflex as rx
 class Notebook(rx.Model, table=True):
     """Modelo para almacenar notebooks generados."""
 
+    # Listado por workspace ordenado por (updated_at, id) desc: ver migración 7f3a9c2d1e64.
+    __table_args__ = (
+        sa.Index("ix_notebook_workspace_id_updated_at", "workspace_id", sa.text("updated_at DESC"), sa.text("id DESC")),
+        *_search_vector_args("notebook", _NOTEBOOK_SEARCH_VECTOR),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     title: str
     content: str  # JSON con el contenido del notebook
     created_at: datetime = datetime.now()
@@ -26,10 +78,49 @@ class Notebook(rx.Model, table=True):
 class AudioTranscription(rx.Model, table=True):
     """Modelo para almacenar transcripciones de audio."""
 
+    __table_args__ = (
+        sa.Index("ix_audiotranscription_workspace_id_created_at", "workspace_id", sa.text("created_at DESC"), sa.text("id DESC")),
+        *_search_vector_args("audiotranscription", _TRANSCRIPTION_SEARCH_VECTOR),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     filename: str
     transcription_text: str  # Consistente con el estado
     audio_duration: str = "0:00"  # ← CAMBIAR: Valor por defecto directo
     created_at: datetime = datetime.now()
     updated_at: datetime = datetime.now()
-    notebook_id: Optional[int] = None
+    notebook_id: Optional[int] = Field(default=None, index=True)
     workspace_id: str = "public"
+
+
+class ProyectoLey(rx.Model, table=True):
+    """Proyecto de ley de la Cámara sincronizado desde camara.gov.co."""
+
+    # Orden numérico y búsqueda por subcadena indexada: ver migración b5d2f9e61c03.
+    __table_args__ = (
+        sa.Index("ix_proyectoley_numero_anio_orden", "numero_anio", "numero_orden"),
+        *_trigram_index_args("proyectoley", "titulo", "numero"),
+    )
+
+    numero: str = Field(index=True, unique=True)  # Número del proyecto (clave natural)
+    titulo: str
+    estado: str = Field(default="N/A", index=True)
+    enlace: str = "N/A"
+    content_hash: str = ""  # huella de la fila para detectar cambios en la sincronización
+    first_seen_at: datetime = Field(default_factory=datetime.now, index=True)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    # Año y consecutivo de `numero` ("9/2024C" -> 2024, 9): el texto ordena "10/2024" antes que "9/2024"
+    numero_anio: int = 0
+    numero_orden: int = 0
+
+
+class UploadedDocument(rx.Model, table=True):
+    """Documento subido, direccionado por contenido y compartido entre sesiones."""
+
+    content_hash: str = Field(index=True, unique=True)  # SHA-256 de los bytes originales
+    filename: str
+    extracted_text: str
+    openai_file_id: str = Field(index=True)
+    ref_count: int = 0  # sesiones que usan el archivo de OpenAI
+    created_at: datetime = Field(default_factory=datetime.now)
+    last_used_at: datetime = Field(default_factory=datetime.now)
@@ -18,30 +18,11 @@ def notebooks_page() -> rx.Component:
             rx.button("Actualizar", on_click=NotebookState.load_user_notebooks, loading=NotebookState.loading, variant="outline"),
             width="100%",
             align="center",
-            margin_bottom="2rem",
-        ),
-        # Estado de carga
-        rx.cond(
-            NotebookState.loading,
-            rx.center(rx.spinner(size="3"), height="200px"),
-            # Lista de notebooks
-            rx.cond(
-                NotebookState.notebooks.length() > 0,
-                rx.vstack(rx.foreach(NotebookState.notebooks, lambda notebook: notebook_card(notebook)), spacing="4", width="100%"),
-                # Estado vacío
-                rx.center(
-                    rx.vstack(
-                        rx.icon("book", size=48, color="gray"),
-                        rx.heading("No tienes notebooks aún", size="6", color="gray"),
-                        rx.text("Los notebooks se crean automáticamente cuando usas el asistente.", color="gray"),
-                        spacing="3",
-                        align="center",
-                    ),
-                    height="300px",
-                    width="100%",
-                ),
-            ),
+            margin_bottom="1rem",
         ),
+        barra_busqueda(),
+        # Resultados de búsqueda o listado paginado
+        rx.cond(NotebookState.search_query != "", resultados_busqueda(), listado_notebooks()),
         # Mensaje de error
         rx.cond(
             NotebookState.error_message != "",
@@ -56,6 +37,128 @@ def notebooks_page() -> rx.Component:
     return main_layout(content)
 
 
+def listado_notebooks() -> rx.Component:
+    """Listado paginado (por cursor) de los notebooks del usuario."""
+    return rx.cond(
+        NotebookState.loading,
+        rx.center(rx.spinner(size="3"), height="200px"),
+        # Lista de notebooks
+        rx.cond(
+            NotebookState.notebooks.length() > 0,
+            rx.vstack(
+                rx.foreach(NotebookState.notebooks, lambda notebook: notebook_card(notebook)),
+                rx.cond(
+                    NotebookState.has_more_notebooks,
+                    rx.center(
+                        rx.button("Cargar más", on_click=NotebookState.load_more_notebooks, loading=NotebookState.loading_more, variant="outline"),
+                        width="100%",
+                    ),
+                    rx.fragment(),
+                ),
+                spacing="4",
+                width="100%",
+            ),
+            # Estado vacío
+            rx.center(
+                rx.vstack(
+                    rx.icon("book", size=48, color="gray"),
+                    rx.heading("No tienes notebooks aún", size="6", color="gray"),
+                    rx.text("Los notebooks se crean automáticamente cuando usas el asistente.", color="gray"),
+                    spacing="3",
+                    align="center",
+                ),
+                height="300px",
+                width="100%",
+            ),
+        ),
+    )
+
+
+def barra_busqueda() -> rx.Component:
+    """Búsqueda de texto completo en notebooks y transcripciones (en el servidor)."""
+    return rx.hstack(
+        rx.input(
+            rx.input.slot(rx.icon("search")),
+            placeholder="Buscar en notebooks y transcripciones...",
+            value=NotebookState.search_query,
+            on_change=NotebookState.set_search_query.debounce(400),
+            width="100%",
+        ),
+        rx.cond(
+            NotebookState.search_query != "",
+            rx.button(rx.icon("x"), on_click=NotebookState.clear_search, variant="ghost"),
+            rx.fragment(),
+        ),
+        width="100%",
+        align="center",
+        margin_bottom="1rem",
+    )
+
+
+def resultados_busqueda() -> rx.Component:
+    """Resultados ordenados por relevancia, paginados y con coincidencias resaltadas."""
+    return rx.vstack(
+        rx.cond(
+            NotebookState.searching,
+            rx.center(rx.spinner(size="3"), height="120px", width="100%"),
+            rx.cond(
+                NotebookState.search_results.length() > 0,
+                rx.vstack(rx.foreach(NotebookState.search_results, search_result_card), spacing="3", width="100%"),
+                rx.center(rx.text("Sin resultados para esta búsqueda.", color="gray"), height="120px", width="100%"),
+            ),
+        ),
+        rx.cond(
+            NotebookState.search_total > 0,
+            rx.hstack(
+                rx.button("Anterior", on_click=NotebookState.search_previous_page, disabled=NotebookState.search_page <= 1, variant="soft"),
+                rx.text(f"Página {NotebookState.search_page} de {NotebookState.search_total_pages} · {NotebookState.search_total} resultados", size="2", color="gray"),
+                rx.button("Siguiente", on_click=NotebookState.search_next_page, disabled=NotebookState.search_page >= NotebookState.search_total_pages, variant="soft"),
+                justify="center",
+                align="center",
+                width="100%",
+            ),
+            rx.fragment(),
+        ),
+        spacing="4",
+        width="100%",
+    )
+
+
+def search_result_card(result: rx.Var) -> rx.Component:
+    """Resultado de búsqueda: los tramos impares de `snippet_parts` son coincidencias."""
+    return rx.card(
+        rx.vstack(
+            rx.hstack(
+                rx.vstack(
+                    rx.heading(result.title, size="4", weight="bold"),
+                    rx.text(rx.cond(result.kind == "transcription", "📝 Transcripción", "🔍 Notebook"), f" · {result.updated_at[:10]}", size="1", color="gray"),
+                    align="start",
+                    spacing="1",
+                ),
+                rx.spacer(),
+                rx.button(
+                    rx.icon("eye"),
+                    "Ver",
+                    on_click=rx.redirect(result.link),
+                    variant="soft",
+                    size="2",
+                ),
+                width="100%",
+                align="center",
+            ),
+            rx.text(
+                rx.foreach(result.snippet_parts, lambda part, i: rx.cond(i % 2 == 1, rx.el.mark(part), rx.text.span(part))),
+                size="2",
+                color="gray",
+            ),
+            spacing="2",
+            align="start",
+            width="100%",
+        ),
+        width="100%",
+    )
+
+
 def notebook_card(notebook: rx.Var) -> rx.Component:
     """Componente para mostrar un notebook en la lista."""
 
@@ -82,11 +185,10 @@ def notebook_card(notebook: rx.Var) -> rx.Component:
             rx.hstack(
                 rx.text(f"Creado: {notebook.created_at[:10]}", size="1", color="gray"),
                 rx.text(f"Actualizado: {notebook.updated_at[:10]}", size="1", color="gray"),
-                rx.cond(notebook.source_data, rx.text(f"Fuente: {notebook.source_data}", size="1", color="gray"), rx.fragment()),
                 spacing="4",
             ),
             # Preview del contenido
-            rx.text("Notebook disponible para visualización", size="2", color="gray"),
+            rx.text(rx.cond(notebook.preview != "", notebook.preview, "Notebook disponible para visualización"), size="2", color="gray"),
             spacing="3",
             align="start",
             width="100%",
@@ -1,16 +1,62 @@
 """Página para visualizar proyectos de ley recientes, usando el layout principal."""
 
-from typing import Dict, List
-from urllib.parse import urljoin
+import logging
+from typing import Dict, List, Tuple
 
 import reflex as rx
-import requests
-from bs4 import BeautifulSoup
+from sqlmodel import func, or_, select
 
 from ..components.layout import main_layout
+from ..models.database import ProyectoLey
+from ..services.proyectos_service import proyectos_service
+
+logger = logging.getLogger("asistente_legal")
 
 Proyecto = Dict[str, str]
 
+# Criterios de orden ofrecidos en la página -> columnas (todas indexadas salvo los desempates).
+ORDENES = {
+    "Más recientes": (ProyectoLey.first_seen_at.desc(), ProyectoLey.id.asc()),
+    "Más antiguos": (ProyectoLey.first_seen_at.asc(), ProyectoLey.id.desc()),
+    "Número": (ProyectoLey.numero_anio.asc(), ProyectoLey.numero_orden.asc(), ProyectoLey.numero.asc()),
+    "Estado": (ProyectoLey.estado.asc(), ProyectoLey.first_seen_at.desc(), ProyectoLey.id.asc()),
+}
+TODOS_LOS_ESTADOS = "Todos"
+
+
+def _to_row(proyecto: ProyectoLey) -> Proyecto:
+    return {"Número": proyecto.numero, "Título": proyecto.titulo, "Estado": proyecto.estado, "Enlace": proyecto.enlace}
+
+
+def consultar_proyectos(busqueda: str, estado: str, orden: str, pagina: int, por_pagina: int) -> Tuple[List[Proyecto], int]:
+    """Consulta una página de proyectos persistidos con filtro y orden en la base."""
+    filtros = []
+    termino = busqueda.strip()
+    if termino:
+        # En Postgres los índices pg_trgm de título y número sirven el ILIKE (términos de 3+ letras)
+        patron = f"%{termino}%"
+        filtros.append(or_(ProyectoLey.titulo.ilike(patron), ProyectoLey.numero.ilike(patron)))
+    if estado and estado != TODOS_LOS_ESTADOS:
+        filtros.append(ProyectoLey.estado == estado)
+
+    with rx.session() as session:
+        total = session.exec(select(func.count()).select_from(ProyectoLey).where(*filtros)).one()
+        query = (
+            select(ProyectoLey)
+            .where(*filtros)
+            .order_by(*ORDENES.get(orden, ORDENES["Más recientes"]))
+            .offset((max(pagina, 1) - 1) * por_pagina)
+            .limit(por_pagina)
+        )
+        rows = [_to_row(p) for p in session.exec(query).all()]
+    return rows, int(total)
+
+
+def consultar_estados() -> List[str]:
+    with rx.session() as session:
+        estados = session.exec(select(ProyectoLey.estado).distinct().order_by(ProyectoLey.estado)).all()
+    return [TODOS_LOS_ESTADOS] + [e for e in estados if e]
+
 
 class ProyectosState(rx.State):
     """Maneja el estado y la lógica para la página de proyectos de ley."""
@@ -18,6 +64,82 @@ class ProyectosState(rx.State):
     proyectos: List[Proyecto] = []
     cargando: bool = False
     error: str = ""
+    _proyectos_version: str = ""  # hash de la tabla ya enviada al cliente
+
+    # Navegación sobre la tabla persistida (filtro, orden y paginación en la base)
+    busqueda: str = ""
+    estado_filtro: str = TODOS_LOS_ESTADOS
+    orden: str = "Más recientes"
+    pagina: int = 1
+    por_pagina: int = 20
+    total: int = 0
+    estados: List[str] = [TODOS_LOS_ESTADOS]
+    desde_base: bool = False  # False mientras la tabla aún no se ha sincronizado
+
+    @rx.var
+    def total_paginas(self) -> int:
+        return max(1, -(-self.total // self.por_pagina))
+
+    def _consultar(self) -> bool:
+        """Carga la página actual desde la base; False si la tabla está vacía o falla."""
+        try:
+            rows, total = consultar_proyectos(self.busqueda, self.estado_filtro, self.orden, self.pagina, self.por_pagina)
+        except Exception as e:
+            self.error = f"Error al consultar proyectos: {e}"
+            return False
+        self.error = ""
+        self.proyectos = rows
+        self.total = total
+        return True
+
+    @rx.event
+    def cargar_proyectos(self):
+        """Carga inicial: consulta la tabla sincronizada o recurre al scraping en caché."""
+        self.pagina = 1
+        try:
+            self.estados = consultar_estados()
+        except Exception as e:
+            self.estados = [TODOS_LOS_ESTADOS]
+            logger.warning(f"No se pudieron cargar los estados de proyectos: {e}")
+        if self._consultar() and self.total > 0:
+            self.desde_base = True
+            return
+        # Tabla aún sin sincronizar (primer arranque): mostrar los recientes del servicio.
+        self.desde_base = False
+        return ProyectosState.scrape_proyectos
+
+    @rx.event
+    def set_busqueda(self, value: str):
+        self.busqueda = value
+        self.pagina = 1
+        if self.desde_base:
+            self._consultar()
+
+    @rx.event
+    def set_estado_filtro(self, value: str):
+        self.estado_filtro = value
+        self.pagina = 1
+        if self.desde_base:
+            self._consultar()
+
+    @rx.event
+    def set_orden(self, value: str):
+        self.orden = value
+        self.pagina = 1
+        if self.desde_base:
+            self._consultar()
+
+    @rx.event
+    def pagina_anterior(self):
+        if self.pagina > 1:
+            self.pagina -= 1
+            self._consultar()
+
+    @rx.event
+    def pagina_siguiente(self):
+        if self.pagina < self.total_paginas:
+            self.pagina += 1
+            self._consultar()
 
     @rx.event(background=True)
     async def scrape_proyectos(self):
@@ -28,40 +150,16 @@ class ProyectosState(rx.State):
             self.cargando = True
             self.error = ""
         try:
-            url_camara = "https://www.camara.gov.co/secretaria/proyectos-de-ley#menu"
-            base_url_camara = "https://www.camara.gov.co"
-            headers = {"User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/91.0.4472.124 Safari/537.36")}
-            response = requests.get(url_camara, timeout=20, headers=headers)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "lxml")
-            tabla_proyectos = soup.find("table", class_="table")
-            proyectos_list = []
-            if tabla_proyectos:
-                tbody = tabla_proyectos.find("tbody")
-                if tbody:
-                    filas = tbody.find_all("tr", class_="tablacomispro", limit=20)
-                    for fila in filas:
-                        num_td = fila.find("td", headers="view-field-numero-de-proyecto-camara-table-column")
-                        tit_td = fila.find("td", headers="view-title-table-column")
-                        link_tag = tit_td.find("a") if tit_td else None
-
-                        enlace_proyecto = "N/A"
-                        if link_tag and link_tag.get("href"):
-                            titulo_proyecto = link_tag.get_text(strip=True)
-                            enlace_proyecto = urljoin(base_url_camara, link_tag["href"])
-                        else:
-                            titulo_proyecto = tit_td.get_text(strip=True) if tit_td else "N/A"
-
-                        proyectos_list.append(
-                            {
-                                "Número": num_td.get_text(strip=True) if num_td else "N/A",
-                                "Título": titulo_proyecto,
-                                "Enlace": enlace_proyecto,
-                            }
-                        )
+            # Se sirve desde la caché del servicio; camara.gov.co solo se consulta al refrescar.
+            proyectos = await proyectos_service.get_proyectos(20)
             async with self:
-                self.proyectos = proyectos_list
+                if proyectos is None:
+                    self.error = "Error al obtener proyectos: el sitio de la Cámara no respondió."
+                elif proyectos_service.version != self._proyectos_version or not self.proyectos:
+                    # Solo se reenvía la tabla si cambió desde el último push
+                    self.proyectos = proyectos
+                    self._proyectos_version = proyectos_service.version
+                    self.total = len(proyectos)
         except Exception as e:
             async with self:
                 self.error = f"Error al obtener proyectos: {e}"
@@ -77,6 +175,7 @@ def render_table(data: rx.Var[list]) -> rx.Component:
             rx.el.tr(
                 rx.el.th("Número", style={"border": "1px solid #60a5fa", "background_color": "#dbeafe", "text_align": "center", "padding": "8px", "font_weight": "bold"}),
                 rx.el.th("Título", style={"border": "1px solid #60a5fa", "background_color": "#dbeafe", "padding": "8px", "font_weight": "bold"}),
+                rx.el.th("Estado", style={"border": "1px solid #60a5fa", "background_color": "#dbeafe", "text_align": "center", "padding": "8px", "font_weight": "bold"}),
                 rx.el.th("Enlace", style={"border": "1px solid #60a5fa", "background_color": "#dbeafe", "text_align": "center", "padding": "8px", "font_weight": "bold"}),
             )
         ),
@@ -86,6 +185,7 @@ def render_table(data: rx.Var[list]) -> rx.Component:
                 lambda row: rx.el.tr(
                     rx.el.td(row["Número"], style={"border": "1px solid #60a5fa", "text_align": "center", "padding": "8px", "font_size": "14px"}),
                     rx.el.td(row["Título"], style={"border": "1px solid #60a5fa", "padding": "8px", "font_size": "14px"}),
+                    rx.el.td(row["Estado"], style={"border": "1px solid #60a5fa", "text_align": "center", "padding": "8px", "font_size": "14px"}),
                     rx.el.td(
                         rx.cond(
                             row["Enlace"] != "N/A",
@@ -102,6 +202,42 @@ def render_table(data: rx.Var[list]) -> rx.Component:
     )
 
 
+def filtros_proyectos() -> rx.Component:
+    """Búsqueda, filtro por estado y orden (se aplican en la base de datos)."""
+    return rx.cond(
+        ProyectosState.desde_base,
+        rx.hstack(
+            rx.input(
+                placeholder="Buscar por título o número...",
+                value=ProyectosState.busqueda,
+                on_change=ProyectosState.set_busqueda.debounce(300),
+                width="100%",
+            ),
+            rx.select(ProyectosState.estados, value=ProyectosState.estado_filtro, on_change=ProyectosState.set_estado_filtro),
+            rx.select(list(ORDENES), value=ProyectosState.orden, on_change=ProyectosState.set_orden),
+            width="100%",
+            spacing="3",
+            wrap="wrap",
+        ),
+    )
+
+
+def paginacion_proyectos() -> rx.Component:
+    """Controles de paginación sobre la tabla persistida."""
+    return rx.cond(
+        ProyectosState.desde_base,
+        rx.hstack(
+            rx.button("Anterior", on_click=ProyectosState.pagina_anterior, disabled=ProyectosState.pagina <= 1, variant="soft"),
+            rx.text(f"Página {ProyectosState.pagina} de {ProyectosState.total_paginas} · {ProyectosState.total} proyectos", size="2", color="gray"),
+            rx.button("Siguiente", on_click=ProyectosState.pagina_siguiente, disabled=ProyectosState.pagina >= ProyectosState.total_paginas, variant="soft"),
+            justify="center",
+            align="center",
+            width="100%",
+            margin_top="1em",
+        ),
+    )
+
+
 # --- CAMBIO PRINCIPAL AQUÍ ---
 # --- PÁGINA DE PROYECTOS ---
 def proyectos_page() -> rx.Component:
@@ -114,6 +250,7 @@ def proyectos_page() -> rx.Component:
             align="center",
             margin_bottom="1.5em",
         ),
+        filtros_proyectos(),
         rx.cond(
             ProyectosState.cargando,
             rx.el.div(
@@ -128,7 +265,7 @@ def proyectos_page() -> rx.Component:
                 rx.cond(
                     ProyectosState.proyectos.length() > 0,
                     # --- AQUÍ ESTÁ EL CAMBIO ---
-                    rx.box(render_table(ProyectosState.proyectos), overflow_x="auto"),  # Permite scroll horizontal en la tabla
+                    rx.box(render_table(ProyectosState.proyectos), paginacion_proyectos(), overflow_x="auto"),  # Permite scroll horizontal en la tabla
                     # --- FIN DEL CAMBIO ---
                     rx.el.p("No hay proyectos disponibles.", class_name="text-gray-400 text-center py-4"),
                 ),
@@ -0,0 +1,123 @@
+"""Puente entre streams síncronos de OpenAI y el event loop de Reflex.
+
+El SDK síncrono entrega los eventos de un run con `for event in stream`, lo que
+bloquea el loop mientras se espera cada chunk. `ThreadedAsyncStream` consume el
+stream en un hilo dedicado y publica los eventos en una cola acotada, de modo
+que el handler puede usar `async for` sin congelar al resto de sesiones.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger("asistente_legal")
+
+# Tamaño de la cola entre el hilo lector y el loop. Si el consumidor se atrasa,
+# el hilo espera (backpressure) en lugar de acumular eventos sin límite.
+DEFAULT_QUEUE_SIZE = 64
+
+_END = object()
+
+
+class _StreamError:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class ThreadedAsyncStream:
+    """Iterador asíncrono que lee un iterable bloqueante desde un hilo propio."""
+
+    def __init__(self, stream: Iterable[Any], maxsize: int = DEFAULT_QUEUE_SIZE):
+        self._stream = stream
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._slots = threading.Semaphore(maxsize)
+        self._finished = False
+
+    def __aiter__(self):
+        if self._thread is None:
+            self._start()
+        return self
+
+    async def __anext__(self):
+        if self._finished:
+            raise StopAsyncIteration
+        if self._thread is None:
+            self._start()
+        item = await self._queue.get()
+        self._slots.release()
+        if item is _END:
+            self._finished = True
+            raise StopAsyncIteration
+        if isinstance(item, _StreamError):
+            self._finished = True
+            raise item.exc
+        return item
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    def _start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._thread = threading.Thread(target=self._pump, name="openai-stream-reader", daemon=True)
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        """Encola desde el hilo lector; devuelve False si el consumidor se fue."""
+        while not self._stop.is_set():
+            # Cola llena: esperar a que el consumidor libere un hueco, revisando `_stop`.
+            if self._slots.acquire(timeout=0.5):
+                try:
+                    self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+                    return True
+                except RuntimeError:
+                    # Loop cerrado: no hay a quién entregar.
+                    return False
+        return False
+
+    def _pump(self):
+        try:
+            for event in self._stream:
+                if not self._put(event):
+                    break
+        except BaseException as e:  # noqa: BLE001 - se re-lanza en el consumidor
+            if not self._stop.is_set():
+                self._put(_StreamError(e))
+                return
+        finally:
+            self._close_source()
+        self._put(_END)
+
+    def _close_source(self):
+        close = getattr(self._stream, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"No se pudo cerrar el stream de OpenAI: {e}")
+
+    async def aclose(self):
+        """Detiene la lectura y libera la conexión HTTP subyacente."""
+        self._finished = True
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is None:
+            self._close_source()
+            return
+        # Cerrar el stream desde otro hilo desbloquea al lector si espera datos.
+        await asyncio.to_thread(self._close_source)
+
+
+def aiter_stream(stream: Iterable[Any], maxsize: int = DEFAULT_QUEUE_SIZE) -> ThreadedAsyncStream:
+    """Envuelve un stream síncrono del SDK para consumirlo con `async for`."""
+    return ThreadedAsyncStream(stream, maxsize=maxsize)
@@ -0,0 +1,118 @@
+"""Registro de documentos subidos direccionado por contenido.
+
+El mismo PDF (por ejemplo, el texto de un proyecto de ley popular) suele
+subirse desde varias sesiones. La clave es el SHA-256 de los bytes originales;
+el registro guarda el texto extraído y el `file_id` de OpenAI, con un contador
+de referencias. Una re-subida reutiliza el archivo existente sin extraer ni
+llamar a `client.files.create`, y el archivo solo se borra de OpenAI cuando la
+última sesión que lo usa lo libera.
+
+Supone una sola cuenta de OpenAI (la `OPENAI_API_KEY` del servidor): los
+`file_id` no son válidos entre cuentas distintas.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import reflex as rx
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from ..models.database import UploadedDocument
+
+logger = logging.getLogger("asistente_legal")
+
+
+@dataclass
+class RegisteredDocument:
+    file_id: str
+    extracted_text: str
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def acquire(digest: str) -> Optional[RegisteredDocument]:
+    """Toma una referencia sobre un documento ya registrado (None si no existe)."""
+    with rx.session() as session:
+        result = session.execute(
+            update(UploadedDocument)
+            .where(UploadedDocument.content_hash == digest)
+            .values(ref_count=UploadedDocument.ref_count + 1, last_used_at=datetime.now())
+        )
+        if result.rowcount == 0:
+            return None
+        doc = session.exec(select(UploadedDocument).where(UploadedDocument.content_hash == digest)).first()
+        session.commit()
+        if doc is None:
+            return None
+        return RegisteredDocument(file_id=doc.openai_file_id, extracted_text=doc.extracted_text)
+
+
+def register(digest: str, filename: str, extracted_text: str, file_id: str) -> RegisteredDocument:
+    """Registra un archivo recién subido con una referencia.
+
+    Si otra sesión registró el mismo contenido entre tanto, se toma una referencia
+    sobre el existente y se devuelve ese: el llamador debe borrar su archivo duplicado.
+    """
+    try:
+        with rx.session() as session:
+            session.add(
+                UploadedDocument(
+                    content_hash=digest,
+                    filename=filename,
+                    extracted_text=extracted_text,
+                    openai_file_id=file_id,
+                    ref_count=1,
+                )
+            )
+            session.commit()
+        return RegisteredDocument(file_id=file_id, extracted_text=extracted_text)
+    except IntegrityError:
+        existing = acquire(digest)
+        if existing is None:
+            # Se liberó justo después del conflicto: reintentar como nuevo.
+            return register(digest, filename, extracted_text, file_id)
+        return existing
+
+
+def release(file_id: str) -> bool:
+    """Suelta una referencia; devuelve True si el archivo de OpenAI debe borrarse.
+
+    Archivos que no están en el registro se borran como antes (True).
+    """
+    with rx.session() as session:
+        result = session.execute(
+            update(UploadedDocument)
+            .where(UploadedDocument.openai_file_id == file_id, UploadedDocument.ref_count > 0)
+            .values(ref_count=UploadedDocument.ref_count - 1)
+        )
+        if result.rowcount == 0:
+            known = session.exec(select(UploadedDocument.id).where(UploadedDocument.openai_file_id == file_id)).first()
+            session.commit()
+            return known is None
+        # Borrado condicional: si otra sesión tomó una referencia, la fila sigue viva.
+        deleted = session.execute(delete(UploadedDocument).where(UploadedDocument.openai_file_id == file_id, UploadedDocument.ref_count <= 0))
+        session.commit()
+    if deleted.rowcount:
+        logger.info(f"Documento {file_id} sin referencias; se borra de OpenAI.")
+        return True
+    return False
+
+
+def forget(file_id: str):
+    """Elimina la entrada de un archivo que ya no existe en OpenAI."""
+    with rx.session() as session:
+        session.execute(delete(UploadedDocument).where(UploadedDocument.openai_file_id == file_id))
+        session.commit()
+
+
+def extracted_text_for(file_id: str) -> Optional[str]:
+    """Texto extraído de un archivo registrado (None si no está en el registro)."""
+    with rx.session() as session:
+        return session.exec(select(UploadedDocument.extracted_text).where(UploadedDocument.openai_file_id == file_id)).first()
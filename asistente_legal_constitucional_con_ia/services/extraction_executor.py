@@ -0,0 +1,207 @@
+"""Ejecutor de extracción de texto fuera del event loop.
+
+PyMuPDF y python-docx son CPU-bound y retienen el GIL: ejecutados en el loop
+(o en un hilo) congelan el streaming del chat de todas las sesiones del
+worker. Aquí la extracción corre en un pool de procesos acotado:
+
+- `EXTRACTION_MAX_WORKERS` procesos, con límite de memoria virtual por
+  proceso (`EXTRACTION_MEMORY_LIMIT_MB`, vía RLIMIT_AS en Linux).
+- Timeout por trabajo (`EXTRACTION_TIMEOUT_S`). Un trabajo vencido no se puede
+  interrumpir dentro de un pool, así que el pool se descarta y se recrea.
+- PDFs grandes se reparten por rangos de páginas como trabajos de este mismo
+  pool, con el mismo límite de memoria, timeout y métricas.
+- `stats()` expone profundidad de cola y latencias de espera y de ejecución.
+"""
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..util.text_extraction import extract_pdf_page_range, extract_text_from_bytes, pdf_page_ranges
+
+logger = logging.getLogger("asistente_legal")
+
+EXTRACTION_MAX_WORKERS = max(1, int(os.getenv("EXTRACTION_MAX_WORKERS", "2")))
+EXTRACTION_TIMEOUT_S = float(os.getenv("EXTRACTION_TIMEOUT_S", "120"))
+EXTRACTION_MEMORY_LIMIT_MB = int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "1536"))
+_LATENCY_WINDOW = 200
+
+
+class ExtractionTimeoutError(TimeoutError):
+    """La extracción superó `EXTRACTION_TIMEOUT_S`."""
+
+
+def _limit_worker_memory(limit_mb: int):
+    """Inicializador del proceso: tope de memoria virtual (MemoryError en lugar de OOM del host)."""
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+
+        limit = limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logging.warning(f"No se pudo limitar la memoria del worker de extracción: {e}")
+
+
+def _extract_job(file_bytes: bytes, filename: str) -> Tuple[Optional[str], float, float]:
+    """Se ejecuta en el worker; devuelve (texto, inicio, fin) en tiempo de reloj."""
+    started = time.time()
+    text = extract_text_from_bytes(file_bytes, filename, skip_ocr=True)
+    return text, started, time.time()
+
+
+def _extract_range_job(file_bytes: bytes, start: int, stop: int) -> Tuple[Optional[str], float, float]:
+    """Rango de páginas de un PDF grande; mismo formato de retorno que `_extract_job`."""
+    started = time.time()
+    text = extract_pdf_page_range(file_bytes, start, stop)
+    return text, started, time.time()
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class ExtractionExecutor:
+    """Pool de procesos acotado para `extract_text_from_bytes`, con métricas."""
+
+    def __init__(self, max_workers: int, timeout_s: float, memory_limit_mb: int):
+        self.max_workers = max_workers
+        self.timeout_s = timeout_s
+        self.memory_limit_mb = memory_limit_mb
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self._wait_s: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._run_s: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # "spawn": el proceso del servidor tiene hilos y fork no es seguro.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_limit_worker_memory,
+                    initargs=(self.memory_limit_mb,),
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Descarta un pool roto o con un trabajo colgado (termina sus procesos)."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        # Terminar primero: los trabajos pendientes del pool reciben BrokenProcessPool
+        # (y se reintentan) en lugar de quedar cancelados.
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        pool.shutdown(wait=False)
+
+    @property
+    def queue_depth(self) -> int:
+        """Trabajos esperando un proceso libre."""
+        return max(0, self._pending - self.max_workers)
+
+    async def extract(self, file_bytes: bytes, filename: str) -> Optional[str]:
+        """Extrae el texto sin bloquear el loop; lanza `ExtractionTimeoutError` si se vence."""
+        if filename.lower().endswith(".pdf"):
+            ranges = await asyncio.to_thread(pdf_page_ranges, file_bytes, self.max_workers)
+            if ranges and len(ranges) > 1:
+                # PDF grande: un trabajo por rango de páginas en este mismo pool
+                pieces = await self._run_jobs(filename, _extract_range_job, [(file_bytes, start, stop) for start, stop in ranges])
+                if any(piece is None for piece in pieces):
+                    return None
+                return "".join(pieces).strip()
+        (text,) = await self._run_jobs(filename, _extract_job, [(file_bytes, filename)])
+        return text
+
+    async def _run_jobs(self, filename: str, job: Callable[..., Tuple[Any, float, float]], job_args: List[tuple]) -> List[Any]:
+        """Ejecuta los trabajos de un archivo bajo un único timeout; reintenta una vez si el pool se rompe."""
+        for attempt in (1, 2):
+            pool = self._get_pool()
+            submitted = time.time()
+            self._pending += len(job_args)
+            try:
+                futures = [asyncio.wrap_future(pool.submit(job, *args)) for args in job_args]
+                outcomes = await asyncio.wait_for(asyncio.gather(*futures), self.timeout_s)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.error(f"Extracción de '{filename}' vencida tras {self.timeout_s:.0f}s; se recrea el pool")
+                self._discard_pool(pool)
+                raise ExtractionTimeoutError(f"La extracción de '{filename}' superó {self.timeout_s:.0f}s")
+            except BrokenProcessPool:
+                # Un worker murió (límite de memoria, o pool descartado por otro trabajo)
+                self._discard_pool(pool)
+                if attempt == 2:
+                    self.failed += 1
+                    raise
+                logger.warning(f"Pool de extracción roto; reintentando '{filename}'")
+                continue
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self._pending -= len(job_args)
+            self.completed += 1
+            for _result, started, finished in outcomes:
+                self._wait_s.append(max(0.0, started - submitted))
+                self._run_s.append(max(0.0, finished - started))
+            first_start = min(started for _r, started, _f in outcomes)
+            last_finish = max(finished for _r, _s, finished in outcomes)
+            logger.info(
+                f"Extracción de '{filename}' ({len(job_args)} trabajo(s)): espera {first_start - submitted:.2f}s, ejecución {last_finish - first_start:.2f}s, cola {self.queue_depth}"
+            )
+            return [result for result, _started, _finished in outcomes]
+        return [None] * len(job_args)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "wait_p50_s": _percentile(self._wait_s, 50),
+            "wait_p95_s": _percentile(self._wait_s, 95),
+            "run_p50_s": _percentile(self._run_s, 50),
+            "run_p95_s": _percentile(self._run_s, 95),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+extraction_executor = ExtractionExecutor(
+    max_workers=EXTRACTION_MAX_WORKERS,
+    timeout_s=EXTRACTION_TIMEOUT_S,
+    memory_limit_mb=EXTRACTION_MEMORY_LIMIT_MB,
+)
+
+
+@contextlib.asynccontextmanager
+async def extraction_executor_lifespan():
+    """Tarea de ciclo de vida para Reflex: cierra el pool al apagar."""
+    try:
+        yield
+    finally:
+        extraction_executor.shutdown()
@@ -0,0 +1,207 @@
+"""Recuperación local BM25 sobre los documentos subidos.
+
+Alternativa a `file_search` de OpenAI: el texto que ya produce
+`extract_text_from_bytes` se parte por artículo/sección y se indexa en el
+proceso. En cada pregunta se recuperan los `k` fragmentos más relevantes y se
+inyectan en el mensaje, sin round trips ni espera de indexación remota.
+
+Se elige por despliegue con `RETRIEVAL_BACKEND=local` (por defecto
+`file_search`). El índice es un inverted index compacto: postings ordenados
+por término en arrays NumPy (id de fragmento + frecuencia) con offsets por
+término, de modo que puntuar una consulta es indexado vectorial por término.
+
+Cada documento guarda además su índice de citas (artículo -> tramo, norma ->
+posiciones). Ese índice se construye en ambos backends: cuando la consulta
+nombra un artículo ("Artículo 5"), su texto exacto se extrae con una búsqueda
+en diccionario y se adjunta al mensaje, sin depender de que el modelo lo
+encuentre en todo el documento.
+"""
+
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..util.legal_chunker import Chunk, CitationIndex, build_citation_index, chunk_legal_text
+from . import document_registry
+
+logger = logging.getLogger("asistente_legal")
+
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "file_search").strip().lower()
+LOCAL_RETRIEVAL_TOP_K = int(os.getenv("LOCAL_RETRIEVAL_TOP_K", "6"))
+LOCAL_RETRIEVAL_MAX_DOCUMENTS = int(os.getenv("LOCAL_RETRIEVAL_MAX_DOCUMENTS", "64"))
+# Tope de caracteres de contexto inyectado en el mensaje
+LOCAL_RETRIEVAL_MAX_CONTEXT_CHARS = int(os.getenv("LOCAL_RETRIEVAL_MAX_CONTEXT_CHARS", "12000"))
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a al algo ante como con contra cual cuando de del desde donde e el ella ellas ellos en entre era es esa ese eso esta este esto fue ha han hasta la las le les lo los mas me mi muy no nos o para pero por que se sea segun ser si sin sobre su sus tambien te tiene un una uno unos y ya".split()
+)
+
+
+def use_local_retrieval() -> bool:
+    return RETRIEVAL_BACKEND == "local"
+
+
+def tokenize(text: str) -> List[str]:
+    """Minúsculas, sin tildes y sin stopwords (los números se conservan: "1437", "c")."""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return [t for t in _TOKEN_RE.findall(normalized) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """Índice BM25 inmutable sobre una lista de textos."""
+
+    def __init__(self, texts: List[str], k1: float = 1.2, b: float = 0.75):
+        self.size = len(texts)
+        self.k1 = k1
+        self.vocab: Dict[str, int] = {}
+        term_ids: List[int] = []
+        chunk_ids: List[int] = []
+        tfs: List[int] = []
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for chunk_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[chunk_id] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(self.vocab.setdefault(term, len(self.vocab)))
+                chunk_ids.append(chunk_id)
+                tfs.append(tf)
+
+        terms = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(terms, kind="stable")  # agrupa postings por término
+        self._postings_chunk = np.asarray(chunk_ids, dtype=np.int32)[order]
+        self._postings_tf = np.asarray(tfs, dtype=np.float32)[order]
+        df = np.bincount(terms, minlength=len(self.vocab))
+        self._offsets = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+        self._idf = np.log1p((self.size - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(lengths.mean()) if self.size and lengths.mean() > 0 else 1.0
+        # Normalización por longitud precalculada: k1 * (1 - b + b * dl / avgdl)
+        self._norm = (k1 * (1.0 - b + b * lengths / avgdl)).astype(np.float32)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Devuelve hasta `k` pares (id de fragmento, score) con score > 0."""
+        if self.size == 0:
+            return []
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            ids = self._postings_chunk[start:end]
+            tf = self._postings_tf[start:end]
+            # Cada fragmento aparece una vez por término: la suma indexada es segura
+            scores[ids] += self._idf[term_id] * tf * (self.k1 + 1.0) / (tf + self._norm[ids])
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+
+@dataclass
+class Passage:
+    filename: str
+    heading: str
+    text: str
+    score: float
+
+
+@dataclass
+class _IndexedDocument:
+    filename: str
+    text: str
+    chunks: List[Chunk]
+    index: BM25Index
+    citations: CitationIndex
+
+
+class LocalRetrievalStore:
+    """Índices por `file_id` (LRU acotado), reconstruibles desde el registro de documentos."""
+
+    def __init__(self, max_documents: int):
+        self.max_documents = max(1, max_documents)
+        self._documents: "OrderedDict[str, _IndexedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index_document(self, file_id: str, filename: str, text: str):
+        chunks = chunk_legal_text(text)
+        document = _IndexedDocument(
+            filename=filename,
+            text=text,
+            chunks=chunks,
+            index=BM25Index([c.text for c in chunks]),
+            citations=build_citation_index(text),
+        )
+        with self._lock:
+            self._documents[file_id] = document
+            self._documents.move_to_end(file_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        logger.info(f"Índice local: '{filename}' ({file_id}) con {len(chunks)} fragmentos y {len(document.citations.articles)} artículos")
+
+    def _get(self, file_id: str, filename: str) -> Optional[_IndexedDocument]:
+        with self._lock:
+            document = self._documents.get(file_id)
+            if document is not None:
+                self._documents.move_to_end(file_id)
+                return document
+        # Otro worker indexó el archivo: reconstruir desde el texto registrado
+        text = document_registry.extracted_text_for(file_id)
+        if text is None:
+            return None
+        self.index_document(file_id, filename, text)
+        with self._lock:
+            return self._documents.get(file_id)
+
+    def search(self, files: List[Tuple[str, str]], query: str, k: int = LOCAL_RETRIEVAL_TOP_K) -> List[Passage]:
+        """Busca en los documentos `(file_id, filename)` de la sesión y mezcla por score."""
+        passages: List[Passage] = []
+        for file_id, filename in files:
+            document = self._get(file_id, filename)
+            if document is None:
+                logger.warning(f"Índice local: sin texto para {file_id}; se omite")
+                continue
+            for chunk_id, score in document.index.search(query, k):
+                chunk = document.chunks[chunk_id]
+                passages.append(Passage(filename=document.filename, heading=chunk.heading, text=chunk.text.strip(), score=score))
+        passages.sort(key=lambda p: p.score, reverse=True)
+        return passages[:k]
+
+    def find_articles(self, files: List[Tuple[str, str]], article_keys: List[str]) -> List[Passage]:
+        """Texto exacto de los artículos pedidos en los documentos de la sesión."""
+        passages: List[Passage] = []
+        for file_id, filename in files:
+            document = self._get(file_id, filename)
+            if document is None:
+                continue
+            for key in article_keys:
+                span = document.citations.article_span(key)
+                if span is not None:
+                    start, end = span
+                    passages.append(Passage(filename=document.filename, heading=f"ARTÍCULO {key.upper()}", text=document.text[start:end].strip(), score=float("inf")))
+        return passages
+
+
+def format_passages(passages: List[Passage], max_chars: int = LOCAL_RETRIEVAL_MAX_CONTEXT_CHARS) -> str:
+    """Bloque de contexto para el mensaje del usuario."""
+    parts: List[str] = []
+    used = 0
+    for i, passage in enumerate(passages, 1):
+        header = f"[Fragmento {i} — {passage.filename}" + (f" — {passage.heading}" if passage.heading else "") + "]"
+        block = f"{header}\n{passage.text}"
+        if used + len(block) > max_chars:
+            break
+        parts.append(block)
+        used += len(block)
+    return "\n\n".join(parts)
+
+
+local_retrieval = LocalRetrievalStore(max_documents=LOCAL_RETRIEVAL_MAX_DOCUMENTS)
@@ -0,0 +1,192 @@
+"""Búsqueda de texto completo sobre notebooks y transcripciones del usuario.
+
+En Postgres usa las columnas generadas `search_vector` (tsvector con
+configuración 'spanish', migración a1c4e8f07b52) y sus índices GIN: la
+consulta se interpreta con `websearch_to_tsquery` (comillas para frases,
+`-palabra` para excluir), se ordena por `ts_rank_cd` y solo las filas de la
+página pasan por `ts_headline` para resaltar coincidencias.
+
+Con SQLite (modo dev de `rxconfig._resolve_db_url`) no hay tsvector: se
+filtra con LIKE por cada término, se ordena por coincidencias en el título y
+fecha, y el fragmento se arma en Python.
+"""
+
+import dataclasses
+import json
+import logging
+import re
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlmodel import and_, case, func, or_, select
+
+from ..models.database import AudioTranscription, Notebook
+
+logger = logging.getLogger("asistente_legal")
+
+SEARCH_PAGE_SIZE = 10
+# Marcadores de resaltado: no aparecen en texto legal ni chocan con JSON/markdown
+_HL_START, _HL_STOP = "⟦", "⟧"
+_HEADLINE_OPTIONS = f'StartSel={_HL_START}, StopSel={_HL_STOP}, MinWords=12, MaxWords=30, MaxFragments=2, FragmentDelimiter=" … "'
+_SNIPPET_CHARS = 240
+# Ruido del JSON de celdas de los notebooks dentro de los fragmentos
+_JSON_NOISE_RE = re.compile(r'\\[nrt]|\\"|"(?:cells|cell_type|markdown|code|source|metadata)"\s*:?|"\s*,\s*"|[{}\[\]"]')
+
+
+@dataclasses.dataclass
+class SearchResult:
+    """Resultado de búsqueda; `snippet_parts` alterna texto normal y resaltado."""
+
+    kind: str  # "notebook" | "transcription"
+    id: int
+    notebook_id: int  # notebook a abrir (0 si la transcripción no tiene)
+    title: str
+    updated_at: str
+    snippet_parts: List[str]
+    link: str = ""
+
+    def __post_init__(self):
+        # Las transcripciones se abren en su notebook; sin notebook, en la página de transcripciones
+        self.link = f"/notebooks/{self.notebook_id}" if self.notebook_id else "/transcription"
+
+
+def _split_highlight(snippet: str) -> List[str]:
+    """"a ⟦b⟧ c" -> ["a ", "b", " c"]: los índices impares van resaltados."""
+    return re.split(f"{_HL_START}(.*?){_HL_STOP}", snippet)
+
+
+def _clean_snippet(snippet: str, from_json: bool) -> str:
+    if from_json:
+        snippet = _JSON_NOISE_RE.sub(" ", snippet)
+    snippet = re.sub(r"(?:^|\s)#+\s+", " ", snippet)  # marcas de encabezado markdown
+    return re.sub(r"\s+", " ", snippet).strip(" ,")
+
+
+def _is_postgres(session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def search_workspace(session, workspace_id: str, query: str, page: int = 1, page_size: int = SEARCH_PAGE_SIZE) -> Tuple[List[SearchResult], int]:
+    """Una página de resultados ordenados por relevancia y el total de coincidencias."""
+    query = query.strip()
+    if not query:
+        return [], 0
+    offset = (max(page, 1) - 1) * page_size
+    if _is_postgres(session):
+        return _search_postgres(session, workspace_id, query, offset, page_size)
+    return _search_like(session, workspace_id, query, offset, page_size)
+
+
+# --- Postgres: tsvector + GIN ---
+
+_POSTGRES_SEARCH_SQL = text(
+    r"""
+    WITH q AS (SELECT websearch_to_tsquery('spanish', :query) AS query),
+    hits AS (
+        SELECT 'notebook' AS kind, n.id, n.id AS notebook_id, n.title, n.updated_at,
+               ts_rank_cd(n.search_vector, q.query) AS rank
+        FROM notebook n, q
+        WHERE n.workspace_id = :workspace_id AND n.search_vector @@ q.query
+        UNION ALL
+        SELECT 'transcription', t.id, coalesce(t.notebook_id, 0), t.filename, t.updated_at,
+               ts_rank_cd(t.search_vector, q.query)
+        FROM audiotranscription t, q
+        WHERE t.workspace_id = :workspace_id AND t.search_vector @@ q.query
+    ),
+    page AS (
+        SELECT hits.*, count(*) OVER () AS total
+        FROM hits
+        ORDER BY rank DESC, updated_at DESC, id DESC
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT page.kind, page.id, page.notebook_id, page.title, page.updated_at, page.total,
+           ts_headline('spanish', regexp_replace(coalesce(n.content, t.transcription_text, ''), '\\[nrt"]', ' ', 'g'), q.query, :headline_options) AS snippet
+    FROM page
+    CROSS JOIN q
+    LEFT JOIN notebook n ON page.kind = 'notebook' AND n.id = page.id
+    LEFT JOIN audiotranscription t ON page.kind = 'transcription' AND t.id = page.id
+    ORDER BY page.rank DESC, page.updated_at DESC, page.id DESC
+    """
+)
+
+
+def _search_postgres(session, workspace_id: str, query: str, offset: int, limit: int) -> Tuple[List[SearchResult], int]:
+    rows = session.execute(
+        _POSTGRES_SEARCH_SQL,
+        {"query": query, "workspace_id": workspace_id, "limit": limit, "offset": offset, "headline_options": _HEADLINE_OPTIONS},
+    ).all()
+    results = [
+        SearchResult(
+            kind=kind,
+            id=row_id,
+            notebook_id=notebook_id or 0,
+            title=title,
+            updated_at=updated_at.isoformat(),
+            snippet_parts=_split_highlight(_clean_snippet(snippet or "", from_json=kind == "notebook")),
+        )
+        for kind, row_id, notebook_id, title, updated_at, _total, snippet in rows
+    ]
+    total = int(rows[0][5]) if rows else 0
+    return results, total
+
+
+# --- SQLite (dev): LIKE ---
+
+def _like_snippet(body: str, terms: List[str]) -> str:
+    """Fragmento alrededor de la primera coincidencia con los términos marcados."""
+    if body.lstrip().startswith("{"):
+        try:
+            cells = json.loads(body).get("cells", [])
+            body = "\n".join("".join(c.get("source", [])) if isinstance(c.get("source"), list) else str(c.get("source", "")) for c in cells)
+        except (ValueError, AttributeError):
+            pass
+    lowered = body.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    start = max(0, min(positions) - _SNIPPET_CHARS // 3) if positions else 0
+    snippet = body[start : start + _SNIPPET_CHARS]
+    for term in sorted(set(terms), key=len, reverse=True):
+        snippet = re.sub(f"({re.escape(term)})", f"{_HL_START}\\1{_HL_STOP}", snippet, flags=re.IGNORECASE)
+    return ("…" if start else "") + snippet + ("…" if start + _SNIPPET_CHARS < len(body) else "")
+
+
+def _search_like(session, workspace_id: str, query: str, offset: int, limit: int) -> Tuple[List[SearchResult], int]:
+    terms = [t for t in re.findall(r"\w+", query.lower()) if len(t) > 1][:8]
+    if not terms:
+        return [], 0
+    sources = (
+        ("notebook", Notebook, Notebook.title, Notebook.content, Notebook.id),
+        ("transcription", AudioTranscription, AudioTranscription.filename, AudioTranscription.transcription_text, func.coalesce(AudioTranscription.notebook_id, 0)),
+    )
+    candidates = []
+    total = 0
+    for kind, model, title_col, body_col, notebook_col in sources:
+        filters = [model.workspace_id == workspace_id] + [or_(title_col.ilike(f"%{t}%"), body_col.ilike(f"%{t}%")) for t in terms]
+        # Relevancia aproximada: términos presentes en el título
+        title_hits = sum(case((title_col.ilike(f"%{t}%"), 1), else_=0) for t in terms)
+        total += session.exec(select(func.count()).select_from(model).where(and_(*filters))).one()
+        # Cada tabla viene ordenada igual que la mezcla: bastan sus primeras offset+limit filas
+        rows = session.exec(
+            select(title_hits, model.updated_at, model.id, notebook_col, title_col)
+            .where(*filters)
+            .order_by(title_hits.desc(), model.updated_at.desc(), model.id.desc())
+            .limit(offset + limit)
+        ).all()
+        candidates.extend((hits, updated_at, row_id, kind, notebook_id, title) for hits, updated_at, row_id, notebook_id, title in rows)
+
+    candidates.sort(key=lambda c: c[:3], reverse=True)
+    results = []
+    for _hits, updated_at, row_id, kind, notebook_id, title in candidates[offset : offset + limit]:
+        model, body_col = (Notebook, Notebook.content) if kind == "notebook" else (AudioTranscription, AudioTranscription.transcription_text)
+        body = session.exec(select(body_col).where(model.id == row_id)).one() or ""
+        results.append(
+            SearchResult(
+                kind=kind,
+                id=row_id,
+                notebook_id=notebook_id or 0,
+                title=title,
+                updated_at=updated_at.isoformat() if isinstance(updated_at, datetime) else str(updated_at),
+                snippet_parts=_split_highlight(_clean_snippet(_like_snippet(body, terms), from_json=False)),
+            )
+        )
+    return results, int(total)
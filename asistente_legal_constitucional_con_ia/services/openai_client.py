@@ -0,0 +1,84 @@
+"""Registro de clientes OpenAI compartidos por proceso.
+
+Crear `OpenAI(api_key=...)` en cada evento descarta el pool HTTP y repite el
+handshake TLS. Aquí se mantiene un cliente por API key, con límites de
+conexiones, keep-alive y HTTP/2 ajustables por variables de entorno, y se
+cierran todos al apagar la app.
+"""
+
+import atexit
+import contextlib
+import importlib.util
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+
+logger = logging.getLogger("asistente_legal")
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY_S = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_S", "60"))
+# HTTP/2 requiere el paquete `h2`; si no está instalado se usa HTTP/1.1.
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+_clients: Dict[str, OpenAI] = {}
+_lock = threading.Lock()
+
+
+def _build_client(api_key: str) -> OpenAI:
+    http_client = DefaultHttpxClient(
+        http2=OPENAI_HTTP2,
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_S,
+        ),
+    )
+    logger.info(f"Cliente OpenAI compartido creado (http2={OPENAI_HTTP2}, max_connections={OPENAI_MAX_CONNECTIONS})")
+    return OpenAI(api_key=api_key, http_client=http_client)
+
+
+def get_openai_client(api_key: str) -> Optional[OpenAI]:
+    """Devuelve el cliente compartido para `api_key` (None si no hay key)."""
+    if not api_key:
+        return None
+    client = _clients.get(api_key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _build_client(api_key)
+            _clients[api_key] = client
+        return client
+
+
+def close_openai_clients():
+    """Cierra los pools HTTP de todos los clientes registrados."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug(f"Error cerrando cliente OpenAI: {e}")
+    if clients:
+        logger.info(f"{len(clients)} cliente(s) OpenAI cerrados.")
+
+
+@contextlib.asynccontextmanager
+async def openai_clients_lifespan():
+    """Tarea de ciclo de vida para Reflex: cierra los clientes al apagar."""
+    try:
+        yield
+    finally:
+        close_openai_clients()
+
+
+# Respaldo si el proceso termina sin pasar por el lifespan de la app.
+atexit.register(close_openai_clients)
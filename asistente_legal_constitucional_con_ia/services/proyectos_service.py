@@ -0,0 +1,131 @@
+"""Servicio único de proyectos de ley de la Cámara, con caché compartida.
+
+Las páginas y el chat leen los proyectos desde memoria. Cuando el dato supera
+`PROYECTOS_TTL_S` se sirve igual (stale-while-revalidate) y se lanza un
+refresco en segundo plano; solo la primera carga del proceso, o un dato más
+viejo que `PROYECTOS_MAX_STALE_S`, espera a camara.gov.co.
+
+Cada refresco es un GET condicional (ETag / If-Modified-Since). Si la página
+no cambió (304, o el mismo HTML por hash) no se vuelve a parsear, y `version`
+(hash de la tabla parseada) permite a los estados omitir pushes sin cambios.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from ..util.scraper import afetch_proyectos_html, parse_proyectos_html
+
+logger = logging.getLogger("asistente_legal")
+
+Proyecto = Dict[str, str]
+
+PROYECTOS_TTL_S = float(os.getenv("PROYECTOS_TTL_S", "600"))
+PROYECTOS_MAX_STALE_S = float(os.getenv("PROYECTOS_MAX_STALE_S", str(24 * 3600)))
+# Se scrapean siempre estas filas; cada llamador toma las que necesita.
+PROYECTOS_FETCH_LIMIT = int(os.getenv("PROYECTOS_FETCH_LIMIT", "20"))
+
+
+class ProyectosService:
+    """Caché en memoria de los proyectos recientes con refresco en segundo plano."""
+
+    def __init__(self, ttl_s: float, max_stale_s: float, fetch_limit: int):
+        self.ttl_s = ttl_s
+        self.max_stale_s = max_stale_s
+        self.fetch_limit = fetch_limit
+        self._proyectos: Optional[List[Proyecto]] = None
+        self._fetched_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Validadores HTTP y huellas para detectar "sin cambios"
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._body_hash = ""
+        self.version = ""
+
+    @property
+    def age_s(self) -> float:
+        return time.time() - self._fetched_at if self._proyectos is not None else float("inf")
+
+    async def get_proyectos(self, limit: Optional[int] = None) -> Optional[List[Proyecto]]:
+        """Devuelve hasta `limit` proyectos, o None si nunca se pudieron obtener."""
+        age = self.age_s
+        if age >= self.max_stale_s:
+            # Sin dato utilizable: esperar el refresco (compartido si ya está en curso).
+            await asyncio.shield(self._ensure_refresh())
+        elif age >= self.ttl_s:
+            self._ensure_refresh()
+        return self._snapshot(limit)
+
+    def _snapshot(self, limit: Optional[int]) -> Optional[List[Proyecto]]:
+        if self._proyectos is None:
+            return None
+        rows = self._proyectos if limit is None else self._proyectos[:limit]
+        return [dict(p) for p in rows]
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        """Lanza un refresco si no hay uno en curso y devuelve su tarea."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    def _remember_validators(self, fetched):
+        # Un 304 puede omitir ETag/Last-Modified: se conservan los anteriores
+        self._etag = fetched.etag or self._etag
+        self._last_modified = fetched.last_modified or self._last_modified
+
+    async def _refresh(self):
+        started = time.time()
+        has_copy = self._proyectos is not None
+        try:
+            # Sin copia previa no tiene sentido un GET condicional.
+            fetched = await afetch_proyectos_html(
+                etag=self._etag if has_copy else None,
+                last_modified=self._last_modified if has_copy else None,
+            )
+        except Exception as e:
+            logger.error(f"Error refrescando proyectos: {e}")
+            fetched = None
+        if fetched is None:
+            logger.warning("No se pudieron refrescar los proyectos; se conserva la copia anterior.")
+            return
+
+        # Los validadores solo se guardan cuando describen la copia que se sirve (304, mismo HTML o
+        # parseo exitoso): si no, el siguiente GET condicional daría 304 sobre una copia vieja.
+        if fetched.not_modified and has_copy:
+            self._remember_validators(fetched)
+            self._fetched_at = time.time()
+            logger.info("Proyectos sin cambios (304); se omite el parseo.")
+            return
+
+        body_hash = hashlib.sha256(fetched.content or b"").hexdigest()
+        if has_copy and body_hash == self._body_hash:
+            self._remember_validators(fetched)
+            self._fetched_at = time.time()
+            logger.info("Proyectos sin cambios (mismo HTML); se omite el parseo.")
+            return
+
+        proyectos = await asyncio.to_thread(parse_proyectos_html, fetched.content or b"", self.fetch_limit)
+        if proyectos is None:
+            logger.warning("No se pudo parsear la tabla de proyectos; se conserva la copia anterior.")
+            return
+        self._remember_validators(fetched)
+        self._body_hash = body_hash
+        self._fetched_at = time.time()
+        version = hashlib.sha256(json.dumps(proyectos, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        if version == self.version:
+            logger.info("Proyectos sin cambios en la tabla; se conserva la copia actual.")
+            return
+        self._proyectos = proyectos
+        self.version = version
+        logger.info(f"Proyectos refrescados: {len(proyectos)} filas en {self._fetched_at - started:.2f}s")
+
+
+proyectos_service = ProyectosService(
+    ttl_s=PROYECTOS_TTL_S,
+    max_stale_s=PROYECTOS_MAX_STALE_S,
+    fetch_limit=PROYECTOS_FETCH_LIMIT,
+)
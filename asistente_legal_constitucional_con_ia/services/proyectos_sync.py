@@ -0,0 +1,204 @@
+"""Sincronización incremental de proyectos de ley hacia la tabla `ProyectoLey`.
+
+El listado de la Cámara está paginado (`?page=N`) y ordenado del más reciente
+al más antiguo. Cada pasada recorre páginas hasta `PROYECTOS_SYNC_MAX_PAGES`,
+pero se detiene en cuanto encuentra `PROYECTOS_SYNC_STOP_AFTER` páginas sin
+filas nuevas ni modificadas: lo anterior ya está en la base. Solo se escriben
+las filas cuyo hash cambió, de modo que /proyectos consulta la base con
+filtros, orden y paginación indexados en lugar de re-scrapear.
+
+La tarea corre en cada worker del backend: en Postgres un advisory lock deja
+que solo uno haga la pasada, y la escritura es un upsert por `numero`
+(`ON CONFLICT ... DO UPDATE`), así dos pasadas simultáneas no chocan con la
+restricción única.
+
+`first_seen_at` ordena "Más recientes": todas las filas nuevas de una pasada
+toman la hora de inicio de la pasada menos su posición en el listado (en
+microsegundos), así la carga inicial conserva el orden de la Cámara en lugar
+de dejar las páginas más antiguas con la hora más reciente.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import reflex as rx
+from reflex.model import get_engine
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+
+from ..models.database import ProyectoLey
+from ..util.scraper import afetch_proyectos_page, parse_proyectos_html
+
+logger = logging.getLogger("asistente_legal")
+
+PROYECTOS_SYNC_ENABLED = os.getenv("PROYECTOS_SYNC_ENABLED", "1") == "1"
+PROYECTOS_SYNC_INTERVAL_S = float(os.getenv("PROYECTOS_SYNC_INTERVAL_S", "3600"))
+PROYECTOS_SYNC_MAX_PAGES = int(os.getenv("PROYECTOS_SYNC_MAX_PAGES", "50"))
+# Páginas consecutivas sin cambios tras las que se da por alcanzado lo ya sincronizado.
+PROYECTOS_SYNC_STOP_AFTER = int(os.getenv("PROYECTOS_SYNC_STOP_AFTER", "2"))
+# Límite de filas por página al parsear (el listado trae bastantes menos).
+_ROWS_PER_PAGE_LIMIT = 1000
+# Clave del advisory lock de Postgres que serializa las pasadas entre workers.
+_SYNC_LOCK_KEY = 4_731_902
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+# "123/2024C", "045 de 2023", "12/24": consecutivo y año
+_NUMERO_RE = re.compile(r"(\d{1,6})\s*(?:/|de)\s*(\d{2,4})", re.IGNORECASE)
+
+
+def numero_sort_key(numero: str) -> Tuple[int, int]:
+    """(año, consecutivo) de un número de proyecto; (0, 0) si no tiene ese formato."""
+    match = _NUMERO_RE.search(numero)
+    if not match:
+        return 0, 0
+    year = int(match.group(2))
+    if year < 100:
+        year += 2000
+    return year, int(match.group(1))
+
+
+def _row_hash(row: Dict[str, str]) -> str:
+    payload = json.dumps(
+        [row.get("Número", ""), row.get("Título", ""), row.get("Estado", ""), row.get("Enlace", "")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def upsert_proyectos(rows: List[Dict[str, str]], seen_at: datetime, position: int = 0) -> Dict[str, int]:
+    """Inserta filas nuevas y actualiza las que cambiaron (bloqueante; usar en un hilo).
+
+    `seen_at` es el inicio de la pasada y `position` la posición de `rows[0]` en el
+    listado completo: una fila nueva recibe `first_seen_at = seen_at - posición µs`.
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    by_numero: Dict[str, Tuple[int, Dict[str, str]]] = {}
+    for offset, row in enumerate(rows):
+        numero = (row.get("Número") or "").strip()
+        if numero and numero != "N/A":
+            # Si una fila aparece repetida entre páginas, se queda la primera (la más reciente).
+            by_numero.setdefault(numero, (position + offset, row))
+    if not by_numero:
+        return stats
+
+    now = datetime.now()
+    values = []
+    with rx.session() as session:
+        existing = dict(session.exec(select(ProyectoLey.numero, ProyectoLey.content_hash).where(ProyectoLey.numero.in_(list(by_numero)))).all())
+        for numero, (listing_position, row) in by_numero.items():
+            row_hash = _row_hash(row)
+            if existing.get(numero) == row_hash:
+                stats["unchanged"] += 1
+                continue
+            stats["updated" if numero in existing else "inserted"] += 1
+            anio, orden = numero_sort_key(numero)
+            values.append(
+                {
+                    "numero": numero,
+                    "titulo": row.get("Título", "N/A"),
+                    "estado": row.get("Estado", "N/A"),
+                    "enlace": row.get("Enlace", "N/A"),
+                    "content_hash": row_hash,
+                    "first_seen_at": seen_at - timedelta(microseconds=listing_position),
+                    "updated_at": now,
+                    "numero_anio": anio,
+                    "numero_orden": orden,
+                }
+            )
+        if values:
+            insert = _UPSERT_INSERTS[session.get_bind().dialect.name]
+            stmt = insert(ProyectoLey).values(values)
+            # Si otro worker insertó el número entre la lectura y la escritura, se actualiza
+            # (conservando first_seen_at) en vez de violar la restricción única.
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProyectoLey.numero],
+                set_={col: stmt.excluded[col] for col in ("titulo", "estado", "enlace", "content_hash", "updated_at")},
+                where=ProyectoLey.content_hash != stmt.excluded.content_hash,
+            )
+            session.execute(stmt)
+            session.commit()
+    return stats
+
+
+def _try_sync_lock():
+    """Conexión que retiene el lock de sincronización, o None si otro worker lo tiene (bloqueante)."""
+    conn = get_engine().connect()
+    if conn.dialect.name != "postgresql":
+        return conn  # SQLite (dev): un solo proceso
+    try:
+        locked = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _SYNC_LOCK_KEY}).scalar()
+        conn.commit()
+    except Exception:
+        conn.close()
+        raise
+    if not locked:
+        conn.close()
+        return None
+    return conn
+
+
+def _release_sync_lock(conn) -> None:
+    # El lock es de sesión: hay que soltarlo antes de devolver la conexión al pool.
+    try:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _SYNC_LOCK_KEY})
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"No se pudo liberar el lock de sincronización ({e}); se descarta la conexión.")
+        conn.invalidate()
+    finally:
+        conn.close()
+
+
+async def sync_proyectos(max_pages: int = PROYECTOS_SYNC_MAX_PAGES, stop_after: int = PROYECTOS_SYNC_STOP_AFTER) -> Dict[str, int]:
+    """Recorre el listado paginado y persiste solo las filas nuevas o modificadas."""
+    totals = {"pages": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    quiet_pages = 0
+    seen_at = datetime.now()
+    position = 0
+    for page in range(max_pages):
+        fetched = await afetch_proyectos_page(page)
+        if fetched is None or not fetched.content:
+            logger.warning(f"Sync de proyectos: no se pudo obtener la página {page}; se detiene la pasada.")
+            break
+        rows = await asyncio.to_thread(parse_proyectos_html, fetched.content, _ROWS_PER_PAGE_LIMIT)
+        if not rows:
+            break  # Fin del listado (o tabla ilegible)
+        stats = await asyncio.to_thread(upsert_proyectos, rows, seen_at, position)
+        position += len(rows)
+        totals["pages"] += 1
+        for key, value in stats.items():
+            totals[key] += value
+        quiet_pages = quiet_pages + 1 if stats["inserted"] == 0 and stats["updated"] == 0 else 0
+        if quiet_pages >= stop_after:
+            break
+    logger.info(f"Sync de proyectos completado: {totals}")
+    return totals
+
+
+async def proyectos_sync_loop():
+    """Tarea de ciclo de vida para Reflex: sincroniza periódicamente mientras la app vive."""
+    if not PROYECTOS_SYNC_ENABLED:
+        return
+    while True:
+        try:
+            lock = await asyncio.to_thread(_try_sync_lock)
+            if lock is None:
+                logger.info("Sync de proyectos: otro worker tiene la pasada en curso; se omite.")
+            else:
+                try:
+                    await sync_proyectos()
+                finally:
+                    await asyncio.to_thread(_release_sync_lock, lock)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error en la sincronización de proyectos: {e}")
+        await asyncio.sleep(PROYECTOS_SYNC_INTERVAL_S)
@@ -0,0 +1,126 @@
+"""Caché de resultados de búsqueda con TTL en dos niveles.
+
+Nivel 1: LRU en memoria del proceso (acotado por número de entradas).
+Nivel 2: Redis compartido entre workers (opcional, vía `REDIS_URL`).
+
+Si Redis no está disponible la caché sigue funcionando solo en memoria; tras
+un error de Redis se deja de consultar durante unos segundos para no sumar
+latencia a cada búsqueda.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("asistente_legal")
+
+_WS_RE = re.compile(r"\s+")
+_REDIS_RETRY_AFTER_S = 30.0
+
+
+def normalize_key(*parts: Optional[str]) -> str:
+    """Normaliza las partes de la clave (minúsculas, espacios colapsados)."""
+    return "|".join(_WS_RE.sub(" ", (p or "").strip().lower()) for p in parts)
+
+
+class TieredTTLCache:
+    """Caché `str -> str` con TTL, LRU local y nivel compartido en Redis."""
+
+    def __init__(self, namespace: str, ttl_s: float, max_entries: int, redis_url: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl_s = ttl_s
+        self.max_entries = max(1, max_entries)
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_url = redis_url
+        self._redis = None
+        self._redis_disabled_until = 0.0
+        self.hits_local = 0
+        self.hits_shared = 0
+        self.misses = 0
+
+    # --- Redis ---
+    def redis_client(self):
+        """Cliente Redis compartido (None si no está configurado o falló hace poco)."""
+        if not self._redis_url or time.time() < self._redis_disabled_until:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(self._redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            except Exception as e:
+                self.redis_failed(e)
+                return None
+        return self._redis
+
+    def redis_failed(self, error: Exception):
+        logger.warning(f"Caché {self.namespace}: Redis no disponible ({error}); usando solo memoria por {_REDIS_RETRY_AFTER_S:.0f}s")
+        self._redis_disabled_until = time.time() + _REDIS_RETRY_AFTER_S
+
+    def shared_key(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"leyia:{self.namespace}:{digest}"
+
+    # --- API ---
+    def get(self, key: str, record_stats: bool = True) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._local.move_to_end(key)
+                    if record_stats:
+                        self.hits_local += 1
+                    return value
+                del self._local[key]
+
+        client = self.redis_client()
+        if client is not None:
+            try:
+                raw = client.get(self.shared_key(key))
+            except Exception as e:
+                self.redis_failed(e)
+                raw = None
+            if raw is not None:
+                value = raw.decode("utf-8") if isinstance(raw, bytes) else str(raw)
+                self._set_local(key, value, now)
+                if record_stats:
+                    with self._lock:
+                        self.hits_shared += 1
+                return value
+
+        if record_stats:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        self._set_local(key, value, time.time())
+        client = self.redis_client()
+        if client is not None:
+            try:
+                client.set(self.shared_key(key), value.encode("utf-8"), ex=max(1, int(self.ttl_s)))
+            except Exception as e:
+                self.redis_failed(e)
+
+    def _set_local(self, key: str, value: str, now: float):
+        with self._lock:
+            self._local[key] = (now + self.ttl_s, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits_local": self.hits_local,
+                "hits_shared": self.hits_shared,
+                "misses": self.misses,
+                "entries_local": len(self._local),
+            }
@@ -0,0 +1,126 @@
+"""Single-flight: una sola llamada en vuelo por clave.
+
+Cuando varios usuarios piden la misma sentencia a la vez, solo el primero
+("líder") ejecuta la búsqueda; el resto espera y recibe su resultado.
+
+- En el mismo worker la coordinación es con `threading.Event` (las
+  herramientas corren en hilos vía `asyncio.to_thread`).
+- Entre workers se usa un lock en Redis (`SET NX PX`) junto al nivel
+  compartido de `TieredTTLCache`: quien no obtiene el lock espera a que el
+  resultado aparezca en la caché. Si el líder falla (resultado no cacheado)
+  o el lock expira, el seguidor ejecuta la llamada por su cuenta.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from .search_cache import TieredTTLCache
+
+logger = logging.getLogger("asistente_legal")
+
+# Borra el lock solo si sigue siendo nuestro (evita liberar el de otro líder).
+_RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Deduplica llamadas concurrentes idénticas en el proceso y entre workers."""
+
+    def __init__(self, cache: TieredTTLCache, lock_ttl_s: float = 45.0, poll_interval_s: float = 0.2):
+        self.cache = cache
+        self.lock_ttl_s = lock_ttl_s
+        self.poll_interval_s = poll_interval_s
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.shared_calls = 0
+
+    def do(self, key: str, fn: Callable[[], str]) -> str:
+        """Ejecuta `fn` una sola vez por `key` entre las llamadas concurrentes."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.shared_calls += 1
+
+        if not leader:
+            # Esperar al líder local; si se pasa del TTL del lock, ejecutar por cuenta propia.
+            if call.done.wait(timeout=self.lock_ttl_s):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            logger.warning(f"single-flight: el líder de '{key}' no terminó a tiempo; ejecutando de nuevo")
+            return fn()
+
+        try:
+            call.result = self._run_across_workers(key, fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            call.done.set()
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _run_across_workers(self, key: str, fn: Callable[[], str]) -> str:
+        client = self.cache.redis_client()
+        if client is None:
+            return fn()
+
+        lock_key = f"{self.cache.shared_key(key)}:lock"
+        token = uuid.uuid4().hex
+        ttl_ms = int(self.lock_ttl_s * 1000)
+        try:
+            acquired = client.set(lock_key, token, nx=True, px=ttl_ms)
+        except Exception as e:
+            self.cache.redis_failed(e)
+            return fn()
+
+        if acquired:
+            try:
+                return fn()
+            finally:
+                try:
+                    client.eval(_RELEASE_LOCK_LUA, 1, lock_key, token)
+                except Exception as e:
+                    self.cache.redis_failed(e)
+
+        # Otro worker está buscando lo mismo: esperar su resultado en la caché compartida.
+        deadline = time.time() + self.lock_ttl_s
+        while time.time() < deadline:
+            time.sleep(self.poll_interval_s)
+            cached = self.cache.get(key, record_stats=False)
+            if cached is not None:
+                with self._lock:
+                    self.shared_calls += 1
+                return cached
+            try:
+                if not client.exists(lock_key):
+                    break
+            except Exception as e:
+                self.cache.redis_failed(e)
+                break
+        cached = self.cache.get(key, record_stats=False)
+        if cached is not None:
+            return cached
+        # El líder remoto falló o expiró sin dejar resultado: buscar directamente.
+        return fn()
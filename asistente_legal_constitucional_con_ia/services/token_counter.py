@@ -26,6 +26,53 @@ def count_text_tokens(text: str, model: str) -> int:
     return len(enc.encode(text or ""))
 
 
+class IncrementalTokenCounter:
+    """Cuenta tokens de un texto que crece por el final (respuestas en streaming).
+
+    Solo re-tokeniza la cola: los últimos `tail_tokens` tokens se codifican de
+    nuevo junto con cada fragmento para absorber los merges de BPE que cruzan
+    el límite entre fragmentos. El resto del texto queda contado y no se toca.
+    """
+
+    def __init__(self, model: str, tail_tokens: int = 8):
+        self._enc = _get_encoding(model)
+        self._tail_tokens = max(1, tail_tokens)
+        self._committed = 0
+        self._tail = ""
+        self._tail_count = 0
+
+    @property
+    def count(self) -> int:
+        return self._committed + self._tail_count
+
+    def append(self, text: str) -> int:
+        """Agrega `text` y devuelve el total acumulado de tokens."""
+        if not text:
+            return self.count
+        self._tail += text
+        tokens = self._enc.encode(self._tail)
+        if len(tokens) > self._tail_tokens:
+            stable = tokens[: -self._tail_tokens]
+            stable_bytes = self._enc.decode_bytes(stable)
+            tail_bytes = self._tail.encode("utf-8")
+            try:
+                rest = tail_bytes[len(stable_bytes) :].decode("utf-8") if tail_bytes.startswith(stable_bytes) else None
+            except UnicodeDecodeError:
+                # El corte cae dentro de un carácter multibyte: consolidar en el próximo fragmento
+                rest = None
+            if rest is not None:
+                self._committed += len(stable)
+                self._tail = rest
+                tokens = tokens[-self._tail_tokens :]
+        self._tail_count = len(tokens)
+        return self.count
+
+    def reset(self):
+        self._committed = 0
+        self._tail = ""
+        self._tail_count = 0
+
+
 def count_chat_tokens(messages: List[Dict[str, str]], model: str) -> int:
     enc = _get_encoding(model)
     tokens = 0
@@ -0,0 +1,52 @@
+"""Pipeline de subida de documentos sin pasar por archivos con nombre en disco.
+
+- La lectura del upload es por bloques y corta en cuanto supera
+  `UPLOAD_MAX_BYTES`, sin cargar archivos gigantes completos en memoria.
+- El texto extraído se entrega a `client.files.create` desde un
+  `SpooledTemporaryFile`: vive en memoria y solo pasa a un temporal anónimo
+  (sin nombre que pueda colisionar entre usuarios) si supera
+  `UPLOAD_SPOOL_MAX_BYTES`.
+"""
+
+import os
+import tempfile
+
+from openai import OpenAI
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """El archivo supera el tamaño máximo permitido."""
+
+    def __init__(self, filename: str, max_bytes: int):
+        super().__init__(f"El archivo '{filename}' supera el máximo de {max_bytes // (1024 * 1024)} MB.")
+        self.filename = filename
+        self.max_bytes = max_bytes
+
+
+async def read_upload_capped(file, max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+    """Lee un `rx.UploadFile` por bloques, abortando si pasa de `max_bytes`."""
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise UploadTooLargeError(file.name, max_bytes)
+    return bytes(buffer)
+
+
+def processed_filename(original_name: str) -> str:
+    return f"{os.path.splitext(original_name)[0]}_processed.txt"
+
+
+def upload_text_to_openai(client: OpenAI, original_name: str, text: str):
+    """Sube el texto extraído como `.txt` desde memoria (o spool anónimo si es grande)."""
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES, mode="w+b") as spool:
+        spool.write(text.encode("utf-8"))
+        spool.seek(0)
+        return client.files.create(file=(processed_filename(original_name), spool, "text/plain"), purpose="assistants")
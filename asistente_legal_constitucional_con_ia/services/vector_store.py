@@ -0,0 +1,67 @@
+"""Vector store de OpenAI por sesión para `file_search`.
+
+Adjuntar los archivos en cada mensaje hace que OpenAI vuelva a indexarlos y
+enlazarlos en cada turno. En su lugar, cada sesión tiene un vector store que
+se crea con la primera subida, se enlaza una vez al thread
+(`tool_resources.file_search`) y al que se agregan o quitan archivos de forma
+incremental. Los loops de limpieza de `ChatState` lo borran; además expira solo
+tras `VECTOR_STORE_EXPIRES_DAYS` sin actividad, por si la sesión se pierde.
+"""
+
+import logging
+import os
+from typing import List
+
+from openai import APIError, OpenAI
+
+logger = logging.getLogger("asistente_legal")
+
+VECTOR_STORE_EXPIRES_DAYS = int(os.getenv("VECTOR_STORE_EXPIRES_DAYS", "1"))
+
+
+def create_session_vector_store(client: OpenAI, name: str) -> str:
+    vector_store = client.vector_stores.create(
+        name=name,
+        expires_after={"anchor": "last_active_at", "days": VECTOR_STORE_EXPIRES_DAYS},
+    )
+    logger.info(f"Vector store de sesión creado: {vector_store.id}")
+    return vector_store.id
+
+
+def add_files(client: OpenAI, vector_store_id: str, file_ids: List[str]) -> List[str]:
+    """Agrega archivos y espera a que queden indexados (el costo se paga al subir, no al preguntar).
+
+    `create_and_poll` no falla si el lote termina `failed` o con archivos fallidos: se devuelven
+    solo los ids `completed`; los demás se quitan del store y siguen adjuntándose por mensaje.
+    """
+    if not file_ids:
+        return []
+    batch = client.vector_stores.file_batches.create_and_poll(vector_store_id=vector_store_id, file_ids=file_ids)
+    counts = batch.file_counts
+    logger.info(f"Vector store {vector_store_id}: lote {batch.id} {batch.status} ({counts.completed}/{counts.total} archivos)")
+    if batch.status == "completed" and counts.completed == len(file_ids):
+        return list(file_ids)
+    completed = {
+        f.id for f in client.vector_stores.file_batches.list_files(batch.id, vector_store_id=vector_store_id, filter="completed") if f.status == "completed"
+    }
+    for file_id in file_ids:
+        if file_id not in completed:
+            logger.warning(f"Vector store {vector_store_id}: {file_id} no se indexó (lote {batch.status})")
+            try:
+                remove_file(client, vector_store_id, file_id)
+            except APIError as e:
+                logger.warning(f"No se pudo quitar {file_id} del vector store: {getattr(e, 'message', str(e))}")
+    return [fid for fid in file_ids if fid in completed]
+
+
+def remove_file(client: OpenAI, vector_store_id: str, file_id: str):
+    client.vector_stores.files.delete(file_id, vector_store_id=vector_store_id)
+
+
+def bind_to_thread(client: OpenAI, thread_id: str, vector_store_id: str):
+    client.beta.threads.update(thread_id, tool_resources={"file_search": {"vector_store_ids": [vector_store_id]}})
+
+
+def delete_vector_store(client: OpenAI, vector_store_id: str):
+    client.vector_stores.delete(vector_store_id)
+    logger.info(f"Vector store de sesión eliminado: {vector_store_id}")
@@ -1,10 +1,9 @@
 # /home/pipid/legalcolrag/asistente_legal_constitucional_con_ia/states/app_state.py
 from typing import Dict, List
-from urllib.parse import urljoin
 
 import reflex as rx
-import requests
-from bs4 import BeautifulSoup
+
+from ..services.proyectos_service import proyectos_service
 
 # --- Modelos de Datos ---
 
@@ -30,6 +29,7 @@ class AppState(rx.State):
     proyectos_cargando: bool = False
     proyectos_error: str = ""
     proyectos_initial_load_done: bool = False
+    _proyectos_version: str = ""  # hash de la tabla ya enviada al cliente
 
     # --- Variables de Prompts ---
     copied_feedback: Dict[str, bool] = {}
@@ -40,40 +40,16 @@ class AppState(rx.State):
         async with self:
             self.proyectos_cargando = True
             self.proyectos_error = ""
-            self.proyectos = []
         try:
-            # ... (Lógica de scraping de proyectos_page.py, idéntica)
-            url_camara = "https://www.camara.gov.co/secretaria/proyectos-de-ley#menu"
-            # ... resto del código de scraping ...
-            base_url_camara = "https://www.camara.gov.co"
-            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
-
-            # Usamos requests de forma síncrona, es más simple para este caso de fondo
-            response = requests.get(url_camara, timeout=20, headers=headers)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "lxml")
-            tabla_proyectos = soup.find("table", class_="table")
-            proyectos_list = []
-            if tabla_proyectos:
-                tbody = tabla_proyectos.find("tbody")
-                if tbody:
-                    filas_proyecto = tbody.find_all("tr", class_="tablacomispro", limit=20)
-                    for fila in filas_proyecto:
-                        num_td = fila.find("td", headers="view-field-numero-de-proyecto-camara-table-column")
-                        numero_proyecto = num_td.get_text(strip=True) if num_td else "N/A"
-                        tit_td = fila.find("td", headers="view-title-table-column")
-                        link_tag = tit_td.find("a") if tit_td else None
-                        if link_tag and link_tag.get("href"):
-                            titulo_proyecto = link_tag.get_text(strip=True)
-                            enlace_proyecto = urljoin(base_url_camara, link_tag["href"])
-                        else:
-                            titulo_proyecto = tit_td.get_text(strip=True) if tit_td else "N/A"
-                            enlace_proyecto = "N/A"
-                        proyectos_list.append({"Número": numero_proyecto, "Título": titulo_proyecto, "Enlace": enlace_proyecto})
-
+            # Misma fuente que la página de proyectos: caché compartida del servicio.
+            proyectos_list = await proyectos_service.get_proyectos(20)
             async with self:
-                self.proyectos = proyectos_list
+                if proyectos_list is None:
+                    self.proyectos_error = "Error en scraping: el sitio de la Cámara no respondió."
+                elif proyectos_service.version != self._proyectos_version or not self.proyectos:
+                    # Solo se reenvía la tabla si cambió desde el último push
+                    self.proyectos = proyectos_list
+                    self._proyectos_version = proyectos_service.version
         except Exception as e:
             async with self:
                 self.proyectos_error = f"Error en scraping: {e}"
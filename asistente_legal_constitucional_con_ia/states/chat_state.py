@@ -2,22 +2,45 @@ import asyncio
 import json
 import logging
 import os
-import tempfile
 import time
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict
 
 import reflex as rx
 from dotenv import load_dotenv
 from openai import APIError, OpenAI
 
+from asistente_legal_constitucional_con_ia.services.async_stream import (
+    aiter_stream,
+)
+from asistente_legal_constitucional_con_ia.services.openai_client import (
+    get_openai_client,
+)
+from asistente_legal_constitucional_con_ia.services.proyectos_service import (
+    proyectos_service,
+)
+from asistente_legal_constitucional_con_ia.services import document_registry, vector_store
+from asistente_legal_constitucional_con_ia.services.extraction_executor import (
+    ExtractionTimeoutError,
+    extraction_executor,
+)
+from asistente_legal_constitucional_con_ia.services.local_retrieval import (
+    format_passages,
+    local_retrieval,
+    use_local_retrieval,
+)
+from asistente_legal_constitucional_con_ia.services.upload_pipeline import (
+    UploadTooLargeError,
+    read_upload_capped,
+    upload_text_to_openai,
+)
 from asistente_legal_constitucional_con_ia.services.token_counter import (
-    count_text_tokens,
+    IncrementalTokenCounter,
 )
-from asistente_legal_constitucional_con_ia.util.scraper import (
-    scrape_proyectos_recientes_camara,
+from asistente_legal_constitucional_con_ia.util.legal_chunker import (
+    referenced_articles,
 )
 from asistente_legal_constitucional_con_ia.util.text_extraction import (
-    extract_text_from_bytes,
+    pdf_looks_scanned,
 )
 from asistente_legal_constitucional_con_ia.util.tools import (
     buscar_documento_legal,
@@ -65,6 +88,10 @@ TOOLS_DEFINITION = [
         },
     }
 ]
+# Con archivos en la sesión el run busca en su vector store (enlazado al thread).
+TOOLS_WITH_FILE_SEARCH = TOOLS_DEFINITION + [{"type": "file_search"}]
+# Documentos por sesión (el uploader limita la selección; handle_upload lo hace cumplir)
+MAX_FILES = 2
 AVAILABLE_TOOLS = {
     "buscar_documento_legal": buscar_documento_legal,
 }
@@ -81,16 +108,26 @@ class FileInfo(TypedDict):
     uploaded_at: float
 
 
+class UploadStatus(TypedDict):
+    filename: str
+    progress: int
+    stage: str
+
+
 class ChatState(rx.State):
     messages: list[Message] = []
     thread_id: Optional[str] = None
     file_info_list: list[FileInfo] = []
     session_files: list[FileInfo] = []
+    vector_store_id: Optional[str] = None  # vector store de la sesión para file_search
+    _vector_store_thread_id: str = ""  # thread al que ya está enlazado el vector store
+    _indexed_file_ids: list[str] = []  # archivos de la sesión ya indexados en el vector store
     processing: bool = False
     uploading: bool = False
     upload_progress: int = 0
+    upload_files_status: list[UploadStatus] = []  # progreso por archivo del lote en curso
     ocr_progress: str = ""  # (OCR removido)
-    proyectos_recientes_df: str = ""
+    proyectos_data: list[dict] = []
     assistant_id: str = os.getenv("ASSISTANT_ID_CONSTITUCIONAL", "")
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     streaming_response: str = ""
@@ -115,6 +152,11 @@ class ChatState(rx.State):
     max_chat_messages: int = 80  # conservar últimas 80 entradas en UI
     stream_min_chars: int = 120  # umbral de chars para actualizar streaming_response
     stream_min_interval_s: float = 0.15  # tiempo mínimo entre updates
+    stream_append_mode: bool = True  # enviar solo el fragmento nuevo; el cliente lo concatena
+    max_parallel_tools: int = 3  # tool calls simultáneas por paso del run
+    max_parallel_uploads: int = 3  # archivos procesados a la vez en handle_upload
+    tool_call_timeout_s: float = 120  # timeout por tool call
+    tool_step_deadline_s: float = 150  # deadline global del paso; lo pendiente se reporta como error
     ocr_max_pages: int = 0  # OCR deshabilitado
 
     model_name: str = ""
@@ -161,10 +203,9 @@ class ChatState(rx.State):
         return f"{self.approx_output_tokens:,}"
 
     @staticmethod
-    def get_client(api_key: str):
-        if api_key:
-            return OpenAI(api_key=api_key)
-        return None
+    def get_client(api_key: str) -> Optional[OpenAI]:
+        # Cliente compartido por proceso: reutiliza el pool HTTP entre eventos
+        return get_openai_client(api_key)
 
     def scroll_to_bottom(self):
         return rx.call_script(
@@ -179,6 +220,17 @@ class ChatState(rx.State):
             """
         )
 
+    def append_stream_fragment(self, fragment: str):
+        """Agrega `fragment` al buffer de streaming del cliente sin reenviar el texto previo."""
+        return rx.call_script(
+            f"""
+            (function(){{
+                const buf = document.getElementById('chat-stream-buffer');
+                if (buf) buf.append({json.dumps(fragment)});
+            }})();
+            """
+        )
+
     def focus_input(self):
         return rx.call_script(
             """
@@ -215,15 +267,6 @@ class ChatState(rx.State):
             async with self:
                 self.thinking_seconds += 1
 
-    @rx.var
-    def proyectos_data(self) -> list[dict]:
-        if not self.proyectos_recientes_df:
-            return []
-        try:
-            return json.loads(self.proyectos_recientes_df)
-        except json.JSONDecodeError:
-            return []
-
     # _perform_ocr_with_progress eliminado (OCR deshabilitado)
 
     @rx.event
@@ -247,79 +290,301 @@ class ChatState(rx.State):
             self.uploading = False
             return
 
-        for i, file in enumerate(files):
-            if any(f["filename"] == file.name for f in self.file_info_list):
+        # Nombres repetidos y archivos por encima del límite de la sesión se descartan antes de arrancar el pipeline
+        available = max(0, MAX_FILES - len(self.file_info_list))
+        batch: List[rx.UploadFile] = []
+        for file in files:
+            if any(f["filename"] == file.name for f in self.file_info_list) or any(b.name == file.name for b in batch):
                 self.upload_error = f"El archivo '{file.name}' ya fue subido."
                 logger.warning(self.upload_error)
                 yield rx.toast.error(self.upload_error)
                 continue
+            if len(batch) >= available:
+                self.upload_error = f"Límite de {MAX_FILES} archivos por sesión: '{file.name}' no se subió."
+                logger.warning(self.upload_error)
+                yield rx.toast.error(self.upload_error)
+                continue
+            batch.append(file)
+        if not batch:
+            self.uploading = False
+            return
 
-            try:
-                logger.info(f"Procesando archivo: {file.name}")
-                upload_data = await file.read()
-                # Primera pasada: extracción directa SIN OCR para PDFs (skip_ocr=True)
-                extracted_text = extract_text_from_bytes(upload_data, file.name, skip_ocr=True)
-
-                # Si es PDF y el texto es insuficiente, rechazar (OCR deshabilitado)
-                if file.name.lower().endswith(".pdf") and (not extracted_text or len(extracted_text.strip()) < 100):
-                    self.upload_error = f"El archivo '{file.name}' parece escaneado o sin texto digital. (OCR deshabilitado)"
-                    logger.warning(self.upload_error)
-                    yield rx.toast.warning("PDF escaneado sin texto. Sube un PDF con texto seleccionable.")
-                    continue
-
-                if not extracted_text or not extracted_text.strip():
-                    self.upload_error = f"No se pudo extraer texto de '{file.name}'."
-                    logger.warning(self.upload_error)
-                    yield rx.toast.warning(self.upload_error)
-                    continue
-
-                original_name_no_ext = os.path.splitext(file.name)[0]
-                temp_filename = f"{original_name_no_ext}_processed.txt"
-                temp_dir = tempfile.gettempdir()
-                tmp_path = os.path.join(temp_dir, temp_filename)
-
-                with open(tmp_path, "w", encoding="utf-8") as tmp_file:
-                    tmp_file.write(extracted_text)
+        # Pipeline concurrente: mientras un archivo se extrae, otro ya puede estar subiendo.
+        self.upload_files_status = [{"filename": f.name, "progress": 0, "stage": "En cola"} for f in batch]
+        progress_queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_uploads))
 
-                try:
-                    response = await asyncio.to_thread(self._upload_file_to_openai, client, tmp_path)
-
-                    self.file_info_list.append({"file_id": response.id, "filename": file.name, "uploaded_at": time.time()})
-                    self.session_files.append({"file_id": response.id, "filename": file.name, "uploaded_at": time.time()})
-
-                    logger.info(f"'{file.name}' subido con id {response.id}.")
-                    self.upload_error = ""
-                    yield rx.toast.success(f"'{file.name}' procesado y subido.")
-                except APIError as e:
-                    self.upload_error = f"Error al subir '{file.name}': {getattr(e, 'message', str(e))}"
-                    logger.error(self.upload_error)
-                    yield rx.toast.error(self.upload_error)
-                finally:
-                    try:
-                        os.remove(tmp_path)
-                    except Exception:
-                        pass
+        async def run_upload(index: int, file: rx.UploadFile):
+            async with semaphore:
+                return await self._process_upload(client, file, lambda pct, stage: progress_queue.put_nowait((index, pct, stage)))
 
-            except Exception as e:
-                self.uploading = False
-                self.is_performing_ocr = False
-                self.ocr_progress = ""
-                self.upload_error = f"Error procesando '{file.name}': {e}"
-                logger.error(self.upload_error)
-                yield rx.toast.error(self.upload_error)
+        known_file_ids = {f["file_id"] for f in self.file_info_list}
+        tasks = [asyncio.create_task(run_upload(i, f)) for i, f in enumerate(batch)]
+        applied: set = set()
+        try:
+            while len(applied) < len(tasks):
+                try:
+                    update = await asyncio.wait_for(progress_queue.get(), timeout=0.25)
+                    while True:
+                        self._set_upload_status(*update)
+                        update = progress_queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    pass
 
-            self.upload_progress = round((i + 1) / len(files) * 100)
+                toasts = []
+                for index, task in enumerate(tasks):
+                    if index in applied or not task.done():
+                        continue
+                    applied.add(index)
+                    toasts.append(await self._apply_upload_result(client, index, batch[index], task))
+                self.upload_progress = round(sum(st["progress"] for st in self.upload_files_status) / len(self.upload_files_status))
+                yield toasts or None
+        finally:
+            for index, task in enumerate(tasks):
+                if not task.done():
+                    task.cancel()  # `_process_upload` suelta lo que ya tenía tomado
+                elif index not in applied and not task.cancelled() and task.exception() is None and task.result()[0]:
+                    # Terminado pero sin aplicar (handler cancelado): su referencia no la soltaría nadie
+                    await self._release_openai_file(client, task.result()[0])
+
+        # Indexar una sola vez en el vector store de la sesión (no en cada mensaje)
+        new_file_ids = [f["file_id"] for f in self.file_info_list if f["file_id"] not in known_file_ids]
+        if new_file_ids and not use_local_retrieval():
+            self.upload_files_status = [{**st, "stage": "Indexando"} if st["stage"] == "Listo" else st for st in self.upload_files_status]
             yield
+            await self._index_session_files(client, new_file_ids)
 
+        self.upload_files_status = []
         self.uploading = False
         self.is_performing_ocr = False
         self.ocr_progress = ""
         logger.info("handle_upload: proceso terminado")
         yield
 
-    def _upload_file_to_openai(self, client: OpenAI, path: str):
-        with open(path, "rb") as f_obj:
-            return client.files.create(file=f_obj, purpose="assistants")
+    def _set_upload_status(self, index: int, progress: int, stage: str):
+        statuses = list(self.upload_files_status)
+        statuses[index] = {**statuses[index], "progress": progress, "stage": stage}
+        self.upload_files_status = statuses
+
+    async def _process_upload(self, client: OpenAI, file: rx.UploadFile, report: Callable[[int, str], None]) -> Tuple[Optional[str], str]:
+        """Lee, deduplica, extrae y sube un archivo.
+
+        Devuelve `(file_id, mensaje)`; `file_id` es None si el archivo se rechazó.
+        No modifica el estado: el handler aplica el resultado al terminar cada archivo.
+        """
+        logger.info(f"Procesando archivo: {file.name}")
+        report(5, "Leyendo")
+        try:
+            upload_data = await read_upload_capped(file)
+        except UploadTooLargeError as e:
+            return None, str(e)
+
+        report(15, "Verificando")
+        digest = await asyncio.to_thread(document_registry.content_hash, upload_data)
+        # Mismo contenido ya subido (por esta u otra sesión): reutilizar sin extraer ni subir
+        shared = await self._acquire_registered_document(client, digest)
+        if shared is not None:
+            logger.info(f"'{file.name}' reutiliza el archivo registrado {shared.file_id}.")
+            try:
+                await asyncio.to_thread(local_retrieval.index_document, shared.file_id, file.name, shared.extracted_text)
+            except asyncio.CancelledError:
+                # Lote cancelado con la referencia ya tomada: nadie aplicará este resultado
+                await self._release_openai_file(client, shared.file_id)
+                raise
+            return shared.file_id, f"'{file.name}' procesado y subido."
+
+        scanned_msg = f"El archivo '{file.name}' parece escaneado o sin texto digital. (OCR deshabilitado)"
+        is_pdf = file.name.lower().endswith(".pdf")
+        # Muestreo rápido: un PDF solo-imagen se rechaza sin extraer todas sus páginas
+        if is_pdf and await asyncio.to_thread(pdf_looks_scanned, upload_data):
+            logger.warning(f"{scanned_msg} (detectado por muestreo)")
+            return None, scanned_msg
+
+        report(25, "Extrayendo texto")
+        # Primera pasada: extracción directa SIN OCR para PDFs (skip_ocr=True)
+        # En el pool de procesos: PyMuPDF retiene el GIL y congelaría el streaming de otras sesiones
+        try:
+            extracted_text = await extraction_executor.extract(upload_data, file.name)
+        except ExtractionTimeoutError as e:
+            logger.error(str(e))
+            return None, f"La extracción de '{file.name}' superó el tiempo límite."
+        # Si es PDF y el texto es insuficiente, rechazar (OCR deshabilitado)
+        if is_pdf and (not extracted_text or len(extracted_text.strip()) < 100):
+            logger.warning(scanned_msg)
+            return None, scanned_msg
+        if not extracted_text or not extracted_text.strip():
+            return None, f"No se pudo extraer texto de '{file.name}'."
+
+        report(70, "Subiendo")
+        try:
+            # El texto va a OpenAI desde memoria, sin escribir/releer un temporal con nombre
+            response = await self._to_thread_or_undo(lambda r: self._delete_openai_file(client, r.id), upload_text_to_openai, client, file.name, extracted_text)
+        except APIError as e:
+            return None, f"Error al subir '{file.name}': {getattr(e, 'message', str(e))}"
+        file_id = None
+        try:
+            file_id = await self._register_uploaded_document(client, digest, file.name, extracted_text, response.id)
+            # Fragmentos e índice de citas (artículos, normas) para ambos backends de recuperación
+            report(90, "Indexando")
+            await asyncio.to_thread(local_retrieval.index_document, file_id, file.name, extracted_text)
+        except asyncio.CancelledError:
+            if file_id is not None:
+                await self._release_openai_file(client, file_id)
+            else:
+                # Cancelado durante el registro: la referencia ya se soltó; falta el archivo subido
+                await self._delete_openai_file(client, response.id)
+            raise
+        logger.info(f"'{file.name}' subido con id {file_id}.")
+        return file_id, f"'{file.name}' procesado y subido."
+
+    async def _apply_upload_result(self, client: OpenAI, index: int, file: rx.UploadFile, task: asyncio.Task):
+        """Aplica al estado el resultado de un archivo terminado y devuelve su toast."""
+        try:
+            file_id, message = task.result()
+        except Exception as e:
+            file_id, message = None, f"Error procesando '{file.name}': {e}"
+        if file_id is not None and any(f["file_id"] == file_id for f in self.file_info_list):
+            # Mismo contenido con otro nombre (en la sesión o en el mismo lote)
+            await self._release_openai_file(client, file_id)
+            file_id, message = None, f"El contenido de '{file.name}' ya fue subido."
+
+        if file_id is None:
+            self._set_upload_status(index, 100, "Error")
+            self.upload_error = message
+            logger.warning(message)
+            return rx.toast.error(message)
+
+        self._set_upload_status(index, 100, "Listo")
+        self.file_info_list.append({"file_id": file_id, "filename": file.name, "uploaded_at": time.time()})
+        self.session_files.append({"file_id": file_id, "filename": file.name, "uploaded_at": time.time()})
+        return rx.toast.success(message)
+
+    async def _index_session_files(self, client: OpenAI, file_ids: List[str]):
+        """Agrega archivos al vector store de la sesión, creándolo con la primera subida."""
+        try:
+            if not self.vector_store_id:
+                self.vector_store_id = await asyncio.to_thread(vector_store.create_session_vector_store, client, "leyia-sesion")
+            indexed = await asyncio.to_thread(vector_store.add_files, client, self.vector_store_id, file_ids)
+            # Solo los `completed`: los fallidos se siguen adjuntando por mensaje
+            self._indexed_file_ids = self._indexed_file_ids + [fid for fid in indexed if fid not in self._indexed_file_ids]
+        except APIError as e:
+            # Los archivos no indexados se siguen adjuntando por mensaje (camino anterior)
+            logger.error(f"No se pudo indexar en el vector store de la sesión: {getattr(e, 'message', str(e))}")
+
+    async def _unindex_session_file(self, client: OpenAI, file_id: str):
+        if not self.vector_store_id or file_id not in self._indexed_file_ids:
+            return
+        try:
+            await asyncio.to_thread(vector_store.remove_file, client, self.vector_store_id, file_id)
+        except APIError as e:
+            logger.warning(f"No se pudo quitar {file_id} del vector store: {getattr(e, 'message', str(e))}")
+        async with self:
+            self._indexed_file_ids = [fid for fid in self._indexed_file_ids if fid != file_id]
+
+    async def _drop_session_vector_store(self, client: OpenAI):
+        """Borra el vector store de la sesión (los archivos se liberan aparte)."""
+        vector_store_id = self.vector_store_id
+        if not vector_store_id:
+            return
+        try:
+            await asyncio.to_thread(vector_store.delete_vector_store, client, vector_store_id)
+        except APIError as e:
+            logger.warning(f"No se pudo borrar el vector store {vector_store_id}: {getattr(e, 'message', str(e))}")
+        async with self:
+            self.vector_store_id = None
+            self._vector_store_thread_id = ""
+            self._indexed_file_ids = []
+
+    async def _to_thread_or_undo(self, undo: Callable[[Any], Any], func: Callable, *args):
+        """`asyncio.to_thread(func, *args)` que no pierde lo creado si la tarea se cancela.
+
+        Cancelar el await no detiene el hilo: la referencia del registro o el archivo
+        subido se crean igual. En ese caso se espera el resultado, se deshace con `undo`
+        y se re-lanza la cancelación.
+        """
+        call = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        try:
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            try:
+                result = await call
+            except Exception:
+                result = None
+            if result is not None:
+                await undo(result)
+            raise
+
+    async def _acquire_registered_document(self, client: OpenAI, digest: str) -> Optional[document_registry.RegisteredDocument]:
+        """Busca el contenido en el registro compartido; None si hay que extraer y subir."""
+        try:
+            shared = await self._to_thread_or_undo(lambda doc: self._release_openai_file(client, doc.file_id), document_registry.acquire, digest)
+        except Exception as e:
+            logger.warning(f"Registro de documentos no disponible: {e}")
+            return None
+        if shared is None:
+            return None
+        try:
+            # El archivo pudo borrarse fuera de la app: verificar antes de reutilizarlo
+            await asyncio.to_thread(client.files.retrieve, shared.file_id)
+            return shared
+        except asyncio.CancelledError:
+            await self._release_openai_file(client, shared.file_id)
+            raise
+        except APIError as e:
+            if getattr(e, "status_code", None) == 404:
+                logger.warning(f"Archivo registrado {shared.file_id} ya no existe en OpenAI; se re-sube.")
+                await asyncio.to_thread(document_registry.forget, shared.file_id)
+            else:
+                await asyncio.to_thread(document_registry.release, shared.file_id)
+            return None
+
+    async def _register_uploaded_document(self, client: OpenAI, digest: str, filename: str, extracted_text: str, file_id: str) -> str:
+        """Registra el archivo subido y devuelve el `file_id` a usar (el existente si otra sesión ganó)."""
+        try:
+            registered = await self._to_thread_or_undo(lambda doc: self._release_openai_file(client, doc.file_id), document_registry.register, digest, filename, extracted_text, file_id)
+        except Exception as e:
+            logger.warning(f"No se pudo registrar '{filename}' en el registro de documentos: {e}")
+            return file_id
+        if registered.file_id != file_id:
+            # Subida concurrente del mismo contenido: conservar el registrado y borrar el duplicado
+            try:
+                await asyncio.to_thread(client.files.delete, file_id)
+            except APIError:
+                pass
+            except asyncio.CancelledError:
+                await self._release_openai_file(client, registered.file_id)
+                raise
+        return registered.file_id
+
+    async def _release_openai_file(self, client: OpenAI, file_id: str):
+        """Suelta la referencia de la sesión; borra en OpenAI solo si ninguna otra sesión lo usa."""
+        try:
+            should_delete = await asyncio.to_thread(document_registry.release, file_id)
+        except Exception as e:
+            # Ante la duda no se borra: otra sesión podría estar usándolo.
+            logger.error(f"Registro de documentos no disponible; se conserva {file_id}: {e}")
+            return
+        if should_delete:
+            await asyncio.to_thread(client.files.delete, file_id)
+
+    async def _claim_session_files(self, file_ids: List[str]) -> List[str]:
+        """Quita los archivos de la sesión (y de la UI) y devuelve los que aún tenía.
+
+        Solo quien los reclama suelta su referencia: la limpieza y `delete_file` pueden
+        coincidir sobre un archivo, y un segundo `release` quitaría la de otra sesión.
+        """
+        async with self:
+            held = {f["file_id"] for f in self.session_files}
+            self.session_files = [f for f in self.session_files if f["file_id"] not in file_ids]
+            self.file_info_list = [f for f in self.file_info_list if f["file_id"] not in file_ids]
+        return [file_id for file_id in dict.fromkeys(file_ids) if file_id in held]
+
+    async def _delete_openai_file(self, client: OpenAI, file_id: str):
+        """Borra un archivo subido que no llegó a registrarse."""
+        try:
+            await asyncio.to_thread(client.files.delete, file_id)
+        except APIError as e:
+            logger.warning(f"No se pudo borrar {file_id} en OpenAI: {getattr(e, 'message', str(e))}")
 
     @rx.event(background=True)
     async def delete_file(self, file_id: str):
@@ -330,11 +595,10 @@ class ChatState(rx.State):
 
         filename = next((f["filename"] for f in self.file_info_list if f["file_id"] == file_id), "archivo")
         try:
-            await asyncio.to_thread(client.files.delete, file_id)
-            # FIX: en eventos background, modificar estado dentro de `async with self:`
-            async with self:
-                self.file_info_list = [f for f in self.file_info_list if f["file_id"] != file_id]
-                self.session_files = [f for f in self.session_files if f["file_id"] != file_id]
+            # Si una limpieza ya lo soltó, solo queda quitarlo de la lista
+            for claimed in await self._claim_session_files([file_id]):
+                await self._unindex_session_file(client, claimed)
+                await self._release_openai_file(client, claimed)
             yield rx.toast.success(f"'{filename}' eliminado.")
         except APIError as e:
             yield rx.toast.error(f"Error eliminando '{filename}': {getattr(e, 'message', str(e))}")
@@ -342,13 +606,13 @@ class ChatState(rx.State):
     @rx.event(background=True)
     async def scrape_proyectos(self):
         async with self:
-            self.proyectos_recientes_df = ""
-        df = await asyncio.to_thread(scrape_proyectos_recientes_camara, 15)
+            self.proyectos_data = []
+        proyectos = await proyectos_service.get_proyectos(15)
         async with self:
-            if df is not None:
-                self.proyectos_recientes_df = df.to_json(orient="records")
+            if proyectos is not None:
+                # Registros planos directo al estado (sin DataFrame ni JSON intermedio)
+                self.proyectos_data = proyectos
             else:
-                self.proyectos_recientes_df = "[]"
                 yield rx.toast.error("No se pudieron obtener los proyectos.")
 
     @rx.event(background=True)
@@ -536,6 +800,7 @@ class ChatState(rx.State):
             logger.info(f"DEBUG: Archivo en sesión: {fi['filename']} -> {fi['file_id']}")
         logger.info(f"generate_response_streaming: INICIO. thread_id={self.thread_id}")
         client = self.get_client(self.openai_api_key)
+        events = None
 
         try:
 
@@ -564,7 +829,38 @@ class ChatState(rx.State):
             except Exception as e:
                 logger.debug(f"Error verificando mensajes del thread: {e}")
 
-            attachments = [{"file_id": fi["file_id"], "tools": [{"type": "file_search"}]} for fi in current_files]
+            # RETRIEVAL_BACKEND=local: los fragmentos se recuperan en el proceso y van en el mensaje
+            local_mode = use_local_retrieval() and bool(current_files)
+            local_context = ""
+            articles_context = ""
+            attachments = []
+            # "Artículo N" en la consulta: adjuntar el texto exacto desde el índice de citas
+            article_keys = referenced_articles(last_user_message) if current_files else []
+            if article_keys:
+                try:
+                    articles = await asyncio.to_thread(local_retrieval.find_articles, [(fi["file_id"], fi["filename"]) for fi in current_files], article_keys)
+                    articles_context = format_passages(articles)
+                    logger.info(f"Índice de citas: {len(articles)} artículos encontrados para {article_keys}")
+                except Exception as e:
+                    logger.warning(f"No se pudo consultar el índice de citas: {e}")
+            if local_mode:
+                passages = await asyncio.to_thread(local_retrieval.search, [(fi["file_id"], fi["filename"]) for fi in current_files], last_user_message)
+                local_context = format_passages(passages)
+                logger.info(f"Recuperación local: {len(passages)} fragmentos para la consulta")
+            else:
+                # Los archivos indexados llegan por el vector store enlazado al thread; solo se
+                # adjuntan por mensaje los que no se pudieron indexar.
+                indexed = set(self._indexed_file_ids)
+                if self.vector_store_id and indexed and self._vector_store_thread_id != self.thread_id:
+                    try:
+                        await asyncio.to_thread(vector_store.bind_to_thread, client, self.thread_id, self.vector_store_id)
+                        async with self:
+                            self._vector_store_thread_id = self.thread_id
+                        logger.info(f"Vector store {self.vector_store_id} enlazado al thread {self.thread_id}")
+                    except APIError as e:
+                        logger.error(f"No se pudo enlazar el vector store al thread: {getattr(e, 'message', str(e))}")
+                        indexed = set()
+                attachments = [{"file_id": fi["file_id"], "tools": [{"type": "file_search"}]} for fi in current_files if fi["file_id"] not in indexed]
 
             logger.info(f"DEBUG ARCHIVO - session_files: {len(self.session_files)}")
             logger.info(f"DEBUG ARCHIVO - current_files: {len(current_files)}")
@@ -576,6 +872,13 @@ class ChatState(rx.State):
                 file_names = [fi["filename"] for fi in current_files]
                 file_list = ", ".join(file_names)
                 message_content = f"{last_user_message}\n\n[Archivos adjuntos: {file_list}]"
+                if articles_context:
+                    message_content += f"\n\n[Texto exacto de los artículos citados]\n{articles_context}"
+                if local_mode:
+                    if local_context:
+                        message_content += f"\n\n[Fragmentos relevantes de los documentos]\n{local_context}"
+                    else:
+                        message_content += "\n\n[SISTEMA: No se encontraron fragmentos relevantes en los documentos]"
             else:
                 message_content = f"{last_user_message}\n\n[SISTEMA: No hay archivos subidos]"
 
@@ -587,10 +890,10 @@ class ChatState(rx.State):
                 attachments=attachments,
             )
 
-            tools_for_run = TOOLS_DEFINITION.copy()
-            if current_files:
-                tools_for_run.append({"type": "file_search"})
+            if current_files and not local_mode:
+                tools_for_run = TOOLS_WITH_FILE_SEARCH
             else:
+                tools_for_run = TOOLS_DEFINITION
                 logger.info("Sin archivos de sesión: NO habilitando file_search")
 
             try:
@@ -614,6 +917,8 @@ class ChatState(rx.State):
                 return
 
             logger.info("generate_response_streaming: Run creado con stream=True.")
+            # Los eventos se leen en un hilo aparte para no bloquear el event loop
+            events = aiter_stream(run_stream)
 
             first_chunk_processed = False
             accumulated_response = ""
@@ -621,11 +926,13 @@ class ChatState(rx.State):
             last_update_time = time.time()
             last_scroll_time = 0.0
             usage_applied = False
+            # Solo tokeniza lo nuevo de cada flush (no la respuesta completa)
+            live_tokens = IncrementalTokenCounter(self.model_name or "gpt-4o-mini")
 
             while True:
                 should_break_outer_loop = False
 
-                for event in run_stream:
+                async for event in events:
                     # Intentar capturar el run_id al inicio
                     try:
                         ev = getattr(event, "event", "")
@@ -646,14 +953,22 @@ class ChatState(rx.State):
                                 should_update = len(accumulated_content) >= self.stream_min_chars or "\n" in text_chunk or (current_time - last_update_time) >= self.stream_min_interval_s
 
                                 if should_update:
+                                    accumulated_response += accumulated_content
                                     async with self:
                                         if not first_chunk_processed:
                                             # vaciar placeholder solo al final; mostrar stream en streaming_response
                                             first_chunk_processed = True
-                                        accumulated_response += accumulated_content
-                                        self.streaming_response = accumulated_response
-                                        self.approx_output_tokens = count_text_tokens(self.streaming_response, self.model_name or "gpt-4o-mini")
-                                    yield
+                                        if self.stream_append_mode:
+                                            # streaming_response solo guarda estados ("Buscando..."); el texto va por fragmentos
+                                            if self.streaming_response:
+                                                self.streaming_response = ""
+                                        else:
+                                            self.streaming_response = accumulated_response
+                                        self.approx_output_tokens = live_tokens.append(accumulated_content)
+                                    if self.stream_append_mode:
+                                        yield self.append_stream_fragment(accumulated_content)
+                                    else:
+                                        yield
 
                                     # scroll con moderación
                                     if (current_time - last_scroll_time) >= 0.8 or len(accumulated_response) % 1000 == 0:
@@ -668,7 +983,6 @@ class ChatState(rx.State):
                         async with self:
                             self.current_run_id = run_id
 
-                        tool_outputs = []
                         # feedback ligero para UI
                         try:
                             first_args = json.loads(event.data.required_action.submit_tool_outputs.tool_calls[0].function.arguments)
@@ -679,22 +993,7 @@ class ChatState(rx.State):
                         except Exception:
                             pass
 
-                        for tool_call in event.data.required_action.submit_tool_outputs.tool_calls:
-                            function_name = tool_call.function.name
-                            arguments = json.loads(tool_call.function.arguments)
-                            if function_name in AVAILABLE_TOOLS:
-                                try:
-                                    output = await asyncio.wait_for(
-                                        asyncio.to_thread(AVAILABLE_TOOLS[function_name], **arguments),
-                                        timeout=120,
-                                    )
-                                except asyncio.TimeoutError:
-                                    logger.error(f"Timeout ejecutando herramienta {function_name}")
-                                    output = f"Error: La herramienta {function_name} tardó demasiado."
-                                except Exception as e:
-                                    logger.error(f"Error en herramienta {function_name}: {e}")
-                                    output = f"Error ejecutando {function_name}: {str(e)}"
-                                tool_outputs.append({"tool_call_id": tool_call.id, "output": output})
+                        tool_outputs = await self._run_tool_calls(event.data.required_action.submit_tool_outputs.tool_calls)
 
                         if tool_outputs:
                             run_stream = await asyncio.to_thread(
@@ -704,6 +1003,8 @@ class ChatState(rx.State):
                                 tool_outputs=tool_outputs,
                                 stream=True,
                             )
+                            await events.aclose()
+                            events = aiter_stream(run_stream)
                             break
 
                     elif event.event in ["thread.run.completed", "thread.run.failed", "error"]:
@@ -719,21 +1020,30 @@ class ChatState(rx.State):
                                 pass
                         else:
                             logger.error(f"Stream: Run fallido. Evento: {event.event}")
+                            accumulated_response = "Repite la solicitud por favor."
+                            accumulated_content = ""
                             async with self:
-                                self.streaming_response = "Repite la solicitud por favor."
+                                self.streaming_response = accumulated_response
                         should_break_outer_loop = True
                         break
+                else:
+                    # El stream terminó sin evento final: no volver a iterarlo
+                    should_break_outer_loop = True
 
                 if should_break_outer_loop:
                     break
 
             # Actualizar cualquier contenido restante
             if accumulated_content:
+                accumulated_response += accumulated_content
                 async with self:
-                    accumulated_response += accumulated_content
-                    self.streaming_response = accumulated_response
-                    self.approx_output_tokens = count_text_tokens(self.streaming_response, self.model_name or "gpt-4o-mini")
-                yield
+                    if not self.stream_append_mode:
+                        self.streaming_response = accumulated_response
+                    self.approx_output_tokens = live_tokens.append(accumulated_content)
+                if self.stream_append_mode:
+                    yield self.append_stream_fragment(accumulated_content)
+                else:
+                    yield
 
             # NUEVO: recuperar usage si no vino en el stream
             if not usage_applied and self.thread_id and self.current_run_id:
@@ -746,10 +1056,11 @@ class ChatState(rx.State):
                 except Exception as e:
                     logger.debug(f"No se pudo recuperar usage del run: {e}")
 
-            # Consolidar streaming_response dentro del mensaje
+            # Consolidar la respuesta completa dentro del mensaje (un único envío)
             async with self:
                 if self.messages:
-                    self.messages[-1]["content"] = self.streaming_response or "Sin contenido."
+                    self.messages[-1]["content"] = accumulated_response or self.streaming_response or "Sin contenido."
+                self.streaming_response = ""
                 self.processing = False
                 self.streaming = False
                 self.thinking_seconds = 0
@@ -773,7 +1084,54 @@ class ChatState(rx.State):
                 self.current_run_id = None
         finally:
             # no yields aquí adicionales, ya se hizo consolidación o error
-            pass
+            if events is not None:
+                await events.aclose()
+
+    async def _run_tool_calls(self, tool_calls) -> list[dict]:
+        """Ejecuta las tool calls de un paso en paralelo, con tope de concurrencia y deadline global.
+
+        Las llamadas que no terminan antes del deadline se devuelven como error para
+        poder enviar igualmente los resultados parciales al run.
+        """
+        semaphore = asyncio.Semaphore(max(1, int(self.max_parallel_tools)))
+        call_timeout = self.tool_call_timeout_s
+
+        async def run_one(tool_call) -> str:
+            function_name = tool_call.function.name
+            async with semaphore:
+                try:
+                    arguments = json.loads(tool_call.function.arguments)
+                    return await asyncio.wait_for(
+                        asyncio.to_thread(AVAILABLE_TOOLS[function_name], **arguments),
+                        timeout=call_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    logger.error(f"Timeout ejecutando herramienta {function_name}")
+                    return f"Error: La herramienta {function_name} tardó demasiado."
+                except Exception as e:
+                    logger.error(f"Error en herramienta {function_name}: {e}")
+                    return f"Error ejecutando {function_name}: {str(e)}"
+
+        calls = [tc for tc in tool_calls if tc.function.name in AVAILABLE_TOOLS]
+        if not calls:
+            return []
+
+        started = time.time()
+        tasks = [asyncio.create_task(run_one(tc)) for tc in calls]
+        _, pending = await asyncio.wait(tasks, timeout=self.tool_step_deadline_s)
+        for task in pending:
+            task.cancel()
+
+        tool_outputs = []
+        for tool_call, task in zip(calls, tasks):
+            if task in pending:
+                logger.error(f"Deadline del paso agotado para {tool_call.function.name}")
+                output = f"Error: La herramienta {tool_call.function.name} no respondió a tiempo."
+            else:
+                output = task.result()
+            tool_outputs.append({"tool_call_id": tool_call.id, "output": output})
+        logger.info(f"{len(calls)} tool call(s) ejecutadas en {time.time() - started:.2f}s ({len(pending)} sin terminar)")
+        return tool_outputs
 
     @rx.event
     def reset_focus_trigger(self):
@@ -900,14 +1258,13 @@ class ChatState(rx.State):
     async def cleanup_session_files(self):
         """Limpia archivos de la sesión en OpenAI (background para no bloquear UI)."""
         client = self.get_client(self.openai_api_key)
-        if client and self.session_files:
-            for file_info in list(self.session_files):
+        if client and (self.session_files or self.vector_store_id):
+            await self._drop_session_vector_store(client)
+            for file_id in await self._claim_session_files([f["file_id"] for f in self.session_files]):
                 try:
-                    await asyncio.to_thread(client.files.delete, file_info["file_id"])
+                    await self._release_openai_file(client, file_id)
                 except APIError:
                     pass
-            async with self:
-                self.session_files = []
 
     @rx.event(background=True)
     async def monitor_session_health(self):
@@ -933,14 +1290,14 @@ class ChatState(rx.State):
         client = self.get_client(self.openai_api_key)
         if client and self.session_files:
             logger.info(f"Limpiando {len(self.session_files)} archivos huérfanos")
-            for file_info in list(self.session_files):
+            await self._drop_session_vector_store(client)
+            for file_id in await self._claim_session_files([f["file_id"] for f in self.session_files]):
                 try:
-                    await asyncio.to_thread(client.files.delete, file_info["file_id"])
-                    logger.info(f"Archivo huérfano eliminado: {file_info['filename']}")
+                    await self._release_openai_file(client, file_id)
+                    logger.info(f"Archivo huérfano eliminado: {file_id}")
                 except APIError:
                     pass
             async with self:
-                self.session_files = []
                 self.thread_id = None
                 logger.info("Estado de sesión limpiado por thread huérfano")
 
@@ -961,14 +1318,13 @@ class ChatState(rx.State):
                     logger.info(f"Encontrados {len(old_files)} archivos antiguos para limpiar")
                     client = self.get_client(self.openai_api_key)
                     if client:
-                        for file_info in old_files:
+                        for file_id in await self._claim_session_files([f["file_id"] for f in old_files]):
                             try:
-                                await asyncio.to_thread(client.files.delete, file_info["file_id"])
-                                logger.info(f"Archivo antiguo eliminado: {file_info['filename']}")
+                                await self._unindex_session_file(client, file_id)
+                                await self._release_openai_file(client, file_id)
+                                logger.info(f"Archivo antiguo eliminado: {file_id}")
                             except APIError:
                                 pass
-                        async with self:
-                            self.session_files = [f for f in self.session_files if f not in old_files]
 
     def _convert_chat_to_notebook(self, chat_messages: List[Dict[str, str]], title: str) -> Dict[str, Any]:
         from datetime import datetime
@@ -8,9 +8,21 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import reflex as rx
+from sqlmodel import and_, func, or_, select
+
 from ..auth_config import lauth
 
 from ..models.database import Notebook
+from ..services.notebook_search import SEARCH_PAGE_SIZE, SearchResult, search_workspace
+
+# Tamaño de página del listado (paginación por cursor sobre (updated_at, id))
+NOTEBOOKS_PAGE_SIZE = 20
+# Vista previa de las tarjetas: la base devuelve solo un prefijo del contenido
+NOTEBOOK_PREVIEW_CHARS = 200
+NOTEBOOK_PREVIEW_SCAN_CHARS = 2000
+_JSON_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+# Valor de "source" de una celda: lista de literales (posiblemente truncada) o un literal suelto
+_JSON_SOURCE_RE = re.compile(r'"source"\s*:\s*(\[(?:\s*"(?:[^"\\]|\\.)*"\s*,?)*|"(?:[^"\\]|\\.)*")')
 
 
 @dataclasses.dataclass
@@ -26,15 +38,106 @@ class NotebookType:
     source_data: Optional[str]  # Cambiar a Optional
 
 
+@dataclasses.dataclass
+class NotebookSummary:
+    """Notebook en el listado: sin `content` ni `source_data`, solo una vista previa."""
+
+    id: int
+    title: str
+    notebook_type: str
+    created_at: str
+    updated_at: str
+    preview: str
+
+
+def _preview_from_prefix(prefix: str) -> str:
+    """Texto plano breve a partir del inicio del contenido (JSON de celdas o markdown)."""
+    if prefix.lstrip().startswith("{"):
+        # Prefijo truncado: no es JSON válido. Solo cuenta el texto de las celdas ("source"),
+        # hasta "metadata" (kernelspec, etc.)
+        prefix = prefix.split('"metadata"', 1)[0]
+        pieces = []
+        for source in _JSON_SOURCE_RE.findall(prefix):
+            for literal in _JSON_STRING_RE.findall(source):
+                try:
+                    pieces.append(json.loads(f'"{literal}"'))
+                except ValueError:
+                    continue
+        prefix = "\n".join(pieces)  # cada literal en su línea: las palabras no se pegan
+    lines = []
+    for line in prefix.splitlines():
+        line = line.strip()
+        # El título y la marca de generación ya se muestran en la tarjeta; "---" es un separador
+        if not line or line == "---" or line.startswith("# ") or line.startswith(("*Generado", "*Notebook generado")):
+            continue
+        lines.append(line.lstrip("#").strip())
+    text = re.sub(r"\s+", " ", " ".join(lines)).strip()
+    return text[:NOTEBOOK_PREVIEW_CHARS] + "..." if len(text) > NOTEBOOK_PREVIEW_CHARS else text
+
+
+def _load_notebook_summaries(
+    session, workspace_id: str, after: Optional[NotebookSummary] = None, limit: int = NOTEBOOKS_PAGE_SIZE
+) -> tuple[list[NotebookSummary], bool]:
+    """Una página del listado del workspace, sin el contenido completo de cada notebook.
+
+    Paginación por cursor: la página siguiente empieza después de `after` en el
+    orden (updated_at desc, id desc), sin OFFSET. Devuelve (página, hay_más).
+    """
+    filters = [Notebook.workspace_id == workspace_id]
+    if after is not None:
+        cursor_updated_at = datetime.fromisoformat(after.updated_at)
+        filters.append(
+            or_(
+                Notebook.updated_at < cursor_updated_at,
+                and_(Notebook.updated_at == cursor_updated_at, Notebook.id < after.id),
+            )
+        )
+    query = (
+        select(
+            Notebook.id,
+            Notebook.title,
+            Notebook.notebook_type,
+            Notebook.created_at,
+            Notebook.updated_at,
+            func.substr(Notebook.content, 1, NOTEBOOK_PREVIEW_SCAN_CHARS),
+        )
+        .where(*filters)
+        .order_by(Notebook.updated_at.desc(), Notebook.id.desc())
+        .limit(limit + 1)  # una fila extra indica si hay más páginas
+    )
+    rows = session.exec(query).all()
+    page = [
+        NotebookSummary(
+            id=nb_id,
+            title=title,
+            notebook_type=notebook_type,
+            created_at=created_at.isoformat(),
+            updated_at=updated_at.isoformat(),
+            preview=_preview_from_prefix(prefix or ""),
+        )
+        for nb_id, title, notebook_type, created_at, updated_at, prefix in rows[:limit]
+    ]
+    return page, len(rows) > limit
+
+
 class NotebookState(rx.State):
     """Estado para gestionar notebooks del usuario."""
 
-    notebooks: list[NotebookType] = []
+    notebooks: list[NotebookSummary] = []
+    has_more_notebooks: bool = False
+    loading_more: bool = False
     current_notebook: Optional[NotebookType] = None
     current_notebook_id: int = 0
     loading: bool = False
     error_message: str = ""
 
+    # Búsqueda de texto completo (notebooks y transcripciones)
+    search_query: str = ""
+    search_results: list[SearchResult] = []
+    search_page: int = 1
+    search_total: int = 0
+    searching: bool = False
+
     # Estados para edición
     is_editing: bool = False
     edit_content: str = ""
@@ -87,6 +190,50 @@ class NotebookState(rx.State):
             await asyncio.sleep(delay_seconds)
         return "public"
 
+    @rx.var
+    def search_total_pages(self) -> int:
+        return max(1, -(-self.search_total // SEARCH_PAGE_SIZE))
+
+    async def _run_search(self):
+        self.searching = True
+        try:
+            workspace_id = await self.get_user_workspace_id()
+            with rx.session() as session:
+                self.search_results, self.search_total = search_workspace(session, workspace_id, self.search_query, self.search_page)
+        except Exception as e:
+            self.error_message = f"Error en la búsqueda: {str(e)}"
+            self.search_results, self.search_total = [], 0
+        finally:
+            self.searching = False
+
+    @rx.event
+    async def set_search_query(self, value: str):
+        """Busca en el servidor al escribir (el input va con debounce)."""
+        self.search_query = value
+        self.search_page = 1
+        if value.strip():
+            await self._run_search()
+        else:
+            self.search_results, self.search_total = [], 0
+
+    @rx.event
+    async def search_next_page(self):
+        if self.search_page < self.search_total_pages:
+            self.search_page += 1
+            await self._run_search()
+
+    @rx.event
+    async def search_previous_page(self):
+        if self.search_page > 1:
+            self.search_page -= 1
+            await self._run_search()
+
+    @rx.event
+    def clear_search(self):
+        self.search_query = ""
+        self.search_page = 1
+        self.search_results, self.search_total = [], 0
+
     def set_edit_content(self, value: str):
         """Actualiza el contenido en edición."""
         self.edit_content = value
@@ -118,28 +265,15 @@ class NotebookState(rx.State):
                 from ..models.database import Notebook
                 new_notebook = Notebook(
                     title=title,
-                    content=json.dumps(notebook_content),
+                    content=json.dumps(notebook_content, ensure_ascii=False),  # sin escapes \uXXXX: el texto queda indexable por la búsqueda
                     notebook_type="analysis",
                     workspace_id=workspace_id,
                 )
                 session.add(new_notebook)
                 session.commit()
 
-                # Recargar lista local sin encadenar eventos
-                db_notebooks = session.exec(Notebook.select().where(Notebook.workspace_id == workspace_id).order_by(Notebook.updated_at.desc())).all()
-
-                self.notebooks = [
-                    NotebookType(
-                        id=nb.id,
-                        title=nb.title,
-                        content=nb.content,
-                        created_at=nb.created_at.isoformat(),
-                        updated_at=nb.updated_at.isoformat(),
-                        notebook_type=nb.notebook_type,
-                        source_data=nb.source_data or "",
-                    )
-                    for nb in db_notebooks
-                ]
+                # Recargar la primera página sin encadenar eventos
+                self.notebooks, self.has_more_notebooks = _load_notebook_summaries(session, workspace_id)
 
             yield rx.toast.success(f"Notebook '{title}' creado exitosamente.")
 
@@ -151,7 +285,7 @@ class NotebookState(rx.State):
 
     @rx.event
     async def load_user_notebooks(self):
-        """Carga todos los notebooks del usuario."""
+        """Carga la primera página del listado (resúmenes) de los notebooks del usuario."""
 
         try:
             self.loading = True
@@ -159,20 +293,8 @@ class NotebookState(rx.State):
             workspace_id = await self._get_workspace_id_with_retry()
 
             with rx.session() as session:
-                db_notebooks = session.exec(Notebook.select().where(Notebook.workspace_id == workspace_id).order_by(Notebook.updated_at.desc())).all()
-
-                self.notebooks = [
-                    NotebookType(
-                        id=nb.id,
-                        title=nb.title,
-                        content=nb.content,  # Ahora contenido directo
-                        created_at=nb.created_at.isoformat(),
-                        updated_at=nb.updated_at.isoformat(),
-                        notebook_type=nb.notebook_type,
-                        source_data=nb.source_data or "",  # Manejar None
-                    )
-                    for nb in db_notebooks
-                ]
+                # Solo resúmenes: el contenido completo se carga al abrir un notebook
+                self.notebooks, self.has_more_notebooks = _load_notebook_summaries(session, workspace_id)
 
         except Exception as e:
             self.error_message = f"Error al cargar notebooks: {str(e)}"
@@ -180,6 +302,24 @@ class NotebookState(rx.State):
         finally:
             self.loading = False
 
+    @rx.event
+    async def load_more_notebooks(self):
+        """Agrega la página siguiente del listado (después del último notebook mostrado)."""
+        if self.loading_more or not self.has_more_notebooks or not self.notebooks:
+            return
+        try:
+            self.loading_more = True
+            workspace_id = await self.get_user_workspace_id()
+            with rx.session() as session:
+                page, self.has_more_notebooks = _load_notebook_summaries(session, workspace_id, after=self.notebooks[-1])
+            known_ids = {nb.id for nb in self.notebooks}
+            self.notebooks = self.notebooks + [nb for nb in page if nb.id not in known_ids]
+        except Exception as e:
+            self.error_message = f"Error al cargar más notebooks: {str(e)}"
+            yield rx.toast.error(self.error_message)
+        finally:
+            self.loading_more = False
+
     @rx.event
     async def delete_notebook(self, notebook_id: int):
         """Elimina un notebook y su transcripción asociada si existe."""
@@ -213,27 +353,8 @@ class NotebookState(rx.State):
 
                 print(f"DEBUG: Eliminado notebook {notebook_id} y " f"{len(associated_transcriptions)} transcripciones")
 
-                # Recargar lista del usuario autenticado
-                self.loading = True
-                try:
-                    db_notebooks = session.exec(Notebook.select().where(Notebook.workspace_id == workspace_id).order_by(Notebook.updated_at.desc())).all()
-
-                    self.notebooks = [
-                        NotebookType(
-                            id=nb.id,
-                            title=nb.title,
-                            content=nb.content,
-                            created_at=nb.created_at.isoformat(),
-                            updated_at=nb.updated_at.isoformat(),
-                            notebook_type=nb.notebook_type,
-                            source_data=nb.source_data or "",
-                        )
-                        for nb in db_notebooks
-                    ]
-                except Exception as load_error:
-                    print(f"DEBUG: Error recargando notebooks: {load_error}")
-                finally:
-                    self.loading = False
+                # Quitarlo de las páginas ya cargadas: el cursor sigue siendo válido
+                self.notebooks = [nb for nb in self.notebooks if nb.id != notebook_id]
 
                 self.error_message = ""
 
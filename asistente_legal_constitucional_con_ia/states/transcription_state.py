@@ -258,7 +258,7 @@ class TranscriptionState(rx.State):
 
             notebook = Notebook(
                 title=title,
-                content=json.dumps(notebook_content),
+                content=json.dumps(notebook_content, ensure_ascii=False),  # sin escapes \uXXXX: el texto queda indexable por la búsqueda
                 workspace_id=workspace_id,
                 notebook_type="transcription",
             )
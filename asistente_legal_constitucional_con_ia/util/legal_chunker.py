@@ -0,0 +1,228 @@
+"""Partición de textos legales en fragmentos e índice de citas.
+
+Las leyes y proyectos colombianos se estructuran en TÍTULO / CAPÍTULO /
+ARTÍCULO / PARÁGRAFO. Cortar ahí mantiene cada artículo (o parágrafo) completo
+dentro de un fragmento, que es la unidad que el usuario suele consultar. Las
+secciones muy largas se subdividen por párrafos y las muy cortas (encabezados
+sueltos) se unen a la siguiente.
+
+`build_citation_index` precalcula, en una sola pasada, el offset de cada
+artículo y las posiciones de cada norma citada ("Ley 1437 de 2011",
+"Sentencia C-123 de 2023"), para extraer un artículo exacto sin buscar.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# El texto extraído de PDFs parte líneas, así que una referencia en prosa ("...conforme al
+# artículo 5 de la Ley...") puede quedar al inicio de línea. Un encabezado es la palabra clave
+# en mayúsculas ("ARTÍCULO 5", "CAPÍTULO II", "PARÁGRAFO 1") o, en otra capitalización, con
+# puntuación de encabezado tras el identificador ("Artículo 5.", "Artículo 12º", "Parágrafo.").
+_HEADING_PUNCT = r"[ \t]*[º°]?[ \t]*[.:–—-]"
+HEADING_RE = re.compile(
+    r"^[ \t]*(?:(?P<upper>ART[IÍ]CULO|CAP[IÍ]TULO|T[IÍ]TULO|SECCI[OÓ]N|PAR[AÁ]GRAFO)\b(?:[ \t]+[\wº°]+)?"
+    rf"|(?P<title>Art[ií]culo|Cap[ií]tulo|T[ií]tulo|Secci[oó]n|Par[aá]grafo)(?:[ \t]+(?:N[oº°]\.?[ \t]*)?[\wº°]+)?(?={_HEADING_PUNCT}))",
+    re.MULTILINE,
+)
+# Artículo numerado al inicio de línea: "ARTÍCULO 5", "Artículo 12o.", "ARTÍCULO 23A", "ARTÍCULO 7-B", "Artículo No. 3."
+ARTICLE_RE = re.compile(
+    rf"^[ \t]*(?:(?P<upper>ART[IÍ]CULO)|Art[ií]culo)[ \t]+(?:N[oº°]\.?[ \t]*)?(?P<number>\d{{1,4}})(?:-?(?P<suffix>[A-Za-z])\b)?(?P<punct>{_HEADING_PUNCT})?",
+    re.MULTILINE,
+)
+# Referencia a un artículo dentro de una consulta: "artículo 5", "Art. 23A"
+ARTICLE_REF_RE = re.compile(r"\bart(?:[íi]culo|\.)?s?[ \t]+(\d{1,4})(?:-?([A-Za-z])\b)?", re.IGNORECASE)
+
+MAX_CHUNK_CHARS = 2000
+MIN_CHUNK_CHARS = 200
+
+
+@dataclass
+class Chunk:
+    text: str
+    start: int  # offset del fragmento en el texto original
+    heading: str  # encabezado con su identificador ("ARTÍCULO 5", "ARTÍCULO 5 · PARÁGRAFO 1"), o "" si no empieza en uno
+
+
+def _split_long(text: str, start: int, heading: str, max_chars: int) -> List[Chunk]:
+    """Subdivide por párrafos una sección que excede `max_chars`."""
+    chunks: List[Chunk] = []
+    piece_start = 0
+    cursor = 0
+    for match in re.finditer(r"\n\s*\n", text):
+        if match.end() - piece_start > max_chars and cursor > piece_start:
+            chunks.append(Chunk(text[piece_start:cursor], start + piece_start, heading))
+            piece_start = cursor
+        cursor = match.end()
+    while len(text) - piece_start > max_chars:
+        # Sin saltos de párrafo utilizables: corte duro
+        chunks.append(Chunk(text[piece_start : piece_start + max_chars], start + piece_start, heading))
+        piece_start += max_chars
+    if piece_start < len(text):
+        chunks.append(Chunk(text[piece_start:], start + piece_start, heading))
+    return chunks
+
+
+def _merged_heading(headings: List[str]) -> str:
+    """Encabezado de secciones unidas: el primer artículo (o parágrafo de artículo) que
+    contienen, no el capítulo o título que las precede ("CAPÍTULO I" + "ARTÍCULO 1")."""
+    for heading in headings:
+        if heading[:3].upper() == "ART":
+            return heading
+    return headings[0] if headings else ""
+
+
+def chunk_legal_text(text: str, max_chars: int = MAX_CHUNK_CHARS, min_chars: int = MIN_CHUNK_CHARS) -> List[Chunk]:
+    """Divide `text` en fragmentos que empiezan en encabezados legales."""
+    boundaries = [m.start() for m in HEADING_RE.finditer(text)]
+    if not boundaries or boundaries[0] != 0:
+        boundaries.insert(0, 0)
+    boundaries.append(len(text))
+
+    sections: List[Chunk] = []
+    pending_start = None
+    pending_headings: List[str] = []
+    current_article = ""
+    for start, end in zip(boundaries, boundaries[1:]):
+        if pending_start is None:
+            pending_start = start
+            pending_headings = []
+        match = HEADING_RE.match(text, start)
+        heading = match.group(0).strip() if match else ""
+        # "Artículo 5" y "ARTÍCULO 5" se normalizan a mayúsculas en el encabezado
+        heading = heading.upper() if match and match.group("title") else heading
+        if heading[:3].upper() == "ART":
+            current_article = heading
+        elif heading[:3].upper() == "PAR" and current_article:
+            heading = f"{current_article} · {heading}"  # el parágrafo conserva su artículo
+        elif heading:
+            current_article = ""
+        if heading:
+            pending_headings.append(heading)
+        if end - pending_start < min_chars and end < len(text):
+            continue  # encabezado suelto: se une a la sección siguiente
+        sections.append(Chunk(text[pending_start:end], pending_start, _merged_heading(pending_headings)))
+        pending_start = None
+
+    chunks: List[Chunk] = []
+    for section in sections:
+        if not section.text.strip():
+            continue
+        if len(section.text) > max_chars:
+            chunks.extend(_split_long(section.text, section.start, section.heading, max_chars))
+        else:
+            chunks.append(section)
+    return chunks
+
+
+# --- Índice de citas ---
+
+_NORM_PATTERNS = [
+    # "Ley 1437 de 2011", "Ley Estatutaria 1581 de 2012"
+    ("Ley", re.compile(r"\bley(?:[ \t]+(?:estatutaria|org[aá]nica))?[ \t]+(\d{1,4})[ \t]+de[ \t]+(\d{4})\b", re.IGNORECASE)),
+    # "Decreto 1072 de 2015", "Decreto Ley 019 de 2012"
+    ("Decreto", re.compile(r"\bdecreto(?:[ \t]+ley)?[ \t]+(\d{1,5})[ \t]+de[ \t]+(\d{4})\b", re.IGNORECASE)),
+    # "Acto Legislativo 02 de 2015"
+    ("Acto Legislativo", re.compile(r"\bacto[ \t]+legislativo[ \t]+(\d{1,3})[ \t]+de[ \t]+(\d{4})\b", re.IGNORECASE)),
+]
+# "Sentencia C-123 de 2023", "sentencia T-760/08", "SU-214 de 2016"
+_SENTENCIA_RE = re.compile(r"\b(?:sentencia[ \t]+)?(C|T|SU|A)[ \t]*[-–][ \t]*(\d{1,4})(?:[ \t]+de[ \t]+(\d{4})|/(\d{2,4}))\b", re.IGNORECASE)
+
+
+def _article_key(number: str, suffix: Optional[str]) -> str:
+    suffix = (suffix or "").lower()
+    if suffix == "o":
+        suffix = ""  # ordinal: "Artículo 1o."
+    return f"{int(number)}{suffix}"
+
+
+def _full_year(year: str) -> str:
+    if len(year) == 2:
+        return ("19" if int(year) >= 90 else "20") + year
+    return year
+
+
+def normalize_norm(kind: str, number: str, year: str) -> str:
+    """Forma canónica de una norma: "Ley 1437 de 2011", "Sentencia C-123 de 2023"."""
+    if kind.upper() in ("C", "T", "SU", "A"):
+        return f"Sentencia {kind.upper()}-{int(number)} de {_full_year(year)}"
+    return f"{kind} {int(number)} de {year}"
+
+
+@dataclass
+class CitationIndex:
+    """Offsets de artículos y posiciones de normas citadas en un documento."""
+
+    text_length: int
+    articles: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)  # "5" -> [(inicio, fin)]
+    norms: Dict[str, List[int]] = field(default_factory=dict)  # "Ley 1437 de 2011" -> [offsets]
+
+    def article_span(self, number: str) -> Optional[Tuple[int, int]]:
+        """Tramo del artículo `number` ("5", "23a") con forma más clara de encabezado; None si no existe."""
+        match = re.fullmatch(r"\s*(\d{1,4})\s*-?\s*([A-Za-z])?\s*", number)
+        if not match:
+            return None
+        spans = self.articles.get(_article_key(*match.groups()))
+        return spans[0] if spans else None
+
+    def norm_positions(self, reference: str) -> List[int]:
+        """Posiciones de una norma citada, aceptando la referencia en forma libre."""
+        for found in find_norms(reference):
+            return self.norms.get(found[0], [])
+        return []
+
+
+def find_norms(text: str) -> List[Tuple[str, int]]:
+    """Normas citadas en `text` como pares (forma canónica, offset)."""
+    matches: List[Tuple[int, int, str]] = []
+    for kind, pattern in _NORM_PATTERNS:
+        for m in pattern.finditer(text):
+            matches.append((m.start(), m.end(), normalize_norm(kind, m.group(1), m.group(2))))
+    for m in _SENTENCIA_RE.finditer(text):
+        matches.append((m.start(), m.end(), normalize_norm(m.group(1), m.group(2), m.group(3) or m.group(4))))
+    # La coincidencia más larga gana ("Decreto Ley 019 de 2012" no es también "Ley 019 de 2012")
+    matches.sort(key=lambda item: (item[0], -item[1]))
+    found: List[Tuple[str, int]] = []
+    covered_until = -1
+    for start, end, norm in matches:
+        if start < covered_until:
+            continue
+        found.append((norm, start))
+        covered_until = end
+    return found
+
+
+def build_citation_index(text: str) -> CitationIndex:
+    """Precalcula artículo -> tramo de texto y norma -> posiciones."""
+    index = CitationIndex(text_length=len(text))
+    # Un artículo termina donde empieza el siguiente artículo, capítulo o título (los parágrafos le pertenecen)
+    structural = [m.start() for m in HEADING_RE.finditer(text) if (m.group("upper") or m.group("title"))[:3].upper() != "PAR"]
+    structural.append(len(text))
+    cursor = 0
+    found: List[Tuple[int, int, int, str]] = []
+    for m in ARTICLE_RE.finditer(text):
+        # Forma de encabezado: mayúsculas (2) + puntuación tras el número (1); sin ninguna es prosa
+        strength = (2 if m.group("upper") else 0) + (1 if m.group("punct") else 0)
+        if strength == 0:
+            continue
+        while structural[cursor] <= m.start():
+            cursor += 1
+        found.append((strength, m.start(), structural[cursor], _article_key(m.group("number"), m.group("suffix"))))
+    # `article_span` devuelve el primer tramo: el de forma más clara de encabezado, luego el más temprano
+    for _strength, start, end, key in sorted(found, key=lambda f: (-f[0], f[1])):
+        index.articles.setdefault(key, []).append((start, end))
+    for norm, offset in find_norms(text):
+        index.norms.setdefault(norm, []).append(offset)
+    return index
+
+
+def referenced_articles(query: str, limit: int = 3) -> List[str]:
+    """Números de artículo mencionados en una consulta ("Artículo 5" -> "5")."""
+    keys: List[str] = []
+    for m in ARTICLE_REF_RE.finditer(query):
+        key = _article_key(m.group(1), m.group(2))
+        if key not in keys:
+            keys.append(key)
+        if len(keys) >= limit:
+            break
+    return keys
@@ -1,68 +1,166 @@
+import asyncio
+import contextlib
 import logging
+import random
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 from urllib.parse import urljoin
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from lxml import etree
+from lxml import html as lxml_html
 
 # --- Constants ---
 URL_CAMARA = "https://www.camara.gov.co/secretaria/proyectos-de-ley#menu"
+URL_CAMARA_LISTADO = "https://www.camara.gov.co/secretaria/proyectos-de-ley"
 BASE_URL_CAMARA = "https://www.camara.gov.co"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 TIMEOUT = 20
+CONNECT_TIMEOUT = 5
+MAX_RETRIES = 3
+RETRY_BASE_DELAY_S = 0.5
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
 
 # --- Logger Setup ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 
-def _fetch_html(url: str) -> Optional[BeautifulSoup]:
-    """Fetches and parses HTML content from a URL."""
-    logging.info(f"Fetching data from: {url}")
+# --- Async HTTP client (pooled, one per worker process) ---
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            follow_redirects=True,
+        )
+    return _async_client
+
+
+async def close_async_client():
+    """Closes the pooled async HTTP client (called on app shutdown)."""
+    global _async_client
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+
+
+@contextlib.asynccontextmanager
+async def scraper_http_lifespan():
+    """Reflex lifespan task that closes the scraper HTTP pool on shutdown."""
     try:
-        headers = {"User-Agent": USER_AGENT}
-        response = requests.get(url, timeout=TIMEOUT, headers=headers)
-        response.raise_for_status()
-        return BeautifulSoup(response.content, "lxml")
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Network error while fetching {url}: {e}")
-        return None
+        yield
+    finally:
+        await close_async_client()
+
+
+@dataclass
+class HtmlFetch:
+    """Result of a (conditional) HTML fetch."""
 
+    content: Optional[bytes]  # None when the server answered 304 Not Modified
+    not_modified: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
-def _parse_proyectos(soup: BeautifulSoup, base_url: str, num_proyectos: int) -> Optional[List[Dict[str, Any]]]:
-    """Parses the projects table from the BeautifulSoup object."""
-    tabla_proyectos = soup.find("table", class_="table")
-    if not tabla_proyectos:
+
+async def _fetch_html_async(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[HtmlFetch]:
+    """Fetches raw HTML without blocking the event loop, retrying transient failures with jitter.
+
+    Sends If-None-Match / If-Modified-Since when validators from a previous fetch are given.
+    """
+    client = _get_async_client()
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            response = await client.get(url, headers=headers)
+            validators = {"etag": response.headers.get("ETag") or etag, "last_modified": response.headers.get("Last-Modified") or last_modified}
+            if response.status_code == 304:
+                return HtmlFetch(content=None, not_modified=True, **validators)
+            if response.status_code in RETRYABLE_STATUS:
+                raise httpx.HTTPStatusError(f"Retryable status {response.status_code}", request=response.request, response=response)
+            response.raise_for_status()
+            return HtmlFetch(content=response.content, **validators)
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRYABLE_STATUS
+            if not retryable or attempt == MAX_RETRIES:
+                logging.error(f"Network error while fetching {url} (attempt {attempt}/{MAX_RETRIES}): {e}")
+                return None
+            # Exponential backoff with full jitter
+            delay = random.uniform(0, RETRY_BASE_DELAY_S * 2 ** (attempt - 1))
+            logging.warning(f"Retrying {url} in {delay:.2f}s after: {e}")
+            await asyncio.sleep(delay)
+    return None
+
+
+def _xp_has_token(attr: str, token: str) -> str:
+    """XPath predicate equivalent to a CSS class / space-separated token match."""
+    return f'contains(concat(" ", normalize-space(@{attr}), " "), " {token} ")'
+
+
+# Compiled once; evaluated directly on the lxml tree (no BeautifulSoup objects per row).
+_XP_TABLE = etree.XPath(f"(//table[{_xp_has_token('class', 'table')}])[1]")
+_XP_TBODY = etree.XPath("(.//tbody)[1]")
+_XP_ROWS = etree.XPath(f".//tr[{_xp_has_token('class', 'tablacomispro')}]")
+_XP_NUMERO = etree.XPath(f"(.//td[{_xp_has_token('headers', 'view-field-numero-de-proyecto-camara-table-column')}])[1]")
+_XP_TITULO = etree.XPath(f"(.//td[{_xp_has_token('headers', 'view-title-table-column')}])[1]")
+_XP_ESTADO = etree.XPath(f"(.//td[{_xp_has_token('headers', 'view-field-estadoley-table-column')}])[1]")
+_XP_LINK = etree.XPath("(.//a)[1]")
+
+
+def _text(element) -> str:
+    """Concatenated, stripped text of an element (same as BeautifulSoup's get_text(strip=True))."""
+    return "".join(part.strip() for part in element.itertext())
+
+
+def _first(xpath: etree.XPath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def _parse_proyectos(content: bytes, base_url: str, num_proyectos: int) -> Optional[List[Dict[str, Any]]]:
+    """Parses the projects table from raw HTML into plain records."""
+    root = lxml_html.document_fromstring(content)
+    tabla_proyectos = _first(_XP_TABLE, root)
+    if tabla_proyectos is None:
         logging.error("Could not find the projects table in the HTML.")
         return None
 
-    tbody = tabla_proyectos.find("tbody")
-    if not tbody:
+    tbody = _first(_XP_TBODY, tabla_proyectos)
+    if tbody is None:
         logging.error("Could not find 'tbody' in the projects table.")
         return None
 
-    filas_proyecto = tbody.find_all("tr", class_="tablacomispro", limit=num_proyectos)
+    filas_proyecto = _XP_ROWS(tbody)[:num_proyectos]
     if not filas_proyecto:
         logging.warning("No project rows found in the table.")
         return []
 
     proyectos_list = []
     for fila in filas_proyecto:
-        num_td = fila.find("td", headers="view-field-numero-de-proyecto-camara-table-column")
-        tit_td = fila.find("td", headers="view-title-table-column")
-        est_td = fila.find("td", headers="view-field-estadoley-table-column")
+        num_td = _first(_XP_NUMERO, fila)
+        tit_td = _first(_XP_TITULO, fila)
+        est_td = _first(_XP_ESTADO, fila)
 
-        numero_proyecto = num_td.get_text(strip=True) if num_td else "N/A"
-        estado_proyecto = est_td.get_text(strip=True) if est_td else "N/A"
+        numero_proyecto = _text(num_td) if num_td is not None else "N/A"
+        estado_proyecto = _text(est_td) if est_td is not None else "N/A"
 
         titulo_proyecto = "N/A"
         enlace_proyecto = "N/A"
-        link_tag = tit_td.find("a") if tit_td else None
-        if link_tag and link_tag.get("href"):
-            titulo_proyecto = link_tag.get_text(strip=True)
-            enlace_proyecto = urljoin(base_url, link_tag["href"])
-        elif tit_td:
-            titulo_proyecto = tit_td.get_text(strip=True)
+        link_tag = _first(_XP_LINK, tit_td) if tit_td is not None else None
+        if link_tag is not None and link_tag.get("href"):
+            titulo_proyecto = _text(link_tag)
+            enlace_proyecto = urljoin(base_url, link_tag.get("href"))
+        elif tit_td is not None:
+            titulo_proyecto = _text(tit_td)
 
         proyectos_list.append(
             {
@@ -77,29 +175,24 @@ def _parse_proyectos(soup: BeautifulSoup, base_url: str, num_proyectos: int) ->
     return proyectos_list
 
 
-def scrape_proyectos_recientes_camara(num_proyectos: int = 15) -> Optional[pd.DataFrame]:
-    """
-    Scrapes recent legislative projects from the Chamber of Representatives of Colombia.
+async def afetch_proyectos_html(etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[HtmlFetch]:
+    """Conditionally fetches the Cámara projects listing (None on network error)."""
+    logging.info(f"Fetching data from: {URL_CAMARA}")
+    return await _fetch_html_async(URL_CAMARA, etag=etag, last_modified=last_modified)
 
-    Args:
-        num_proyectos: The maximum number of projects to scrape.
 
-    Returns:
-        A pandas DataFrame containing the scraped projects, or None if an error occurs.
-    """
-    soup = _fetch_html(URL_CAMARA)
-    if not soup:
-        return None
-
-    try:
-        proyectos_data = _parse_proyectos(soup, BASE_URL_CAMARA, num_proyectos)
-        if proyectos_data is None:
-            return None
-        if not proyectos_data:
-            return pd.DataFrame()  # Return empty DataFrame if no projects found
+async def afetch_proyectos_page(page: int) -> Optional[HtmlFetch]:
+    """Fetches one page (0-based, Drupal `?page=N` pager) of the Cámara projects listing."""
+    url = URL_CAMARA_LISTADO if page <= 0 else f"{URL_CAMARA_LISTADO}?page={page}"
+    logging.info(f"Fetching data from: {url}")
+    return await _fetch_html_async(url)
 
-        return pd.DataFrame(proyectos_data)
 
+def parse_proyectos_html(content: bytes, num_proyectos: int = 15) -> Optional[List[Dict[str, Any]]]:
+    """Parses the projects table from raw HTML (CPU-bound; run it off the event loop)."""
+    try:
+        return _parse_proyectos(content, BASE_URL_CAMARA, num_proyectos)
     except Exception as e:
         logging.error(f"An unexpected error occurred during scraping: {e}", exc_info=True)
         return None
+
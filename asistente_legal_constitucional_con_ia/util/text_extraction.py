@@ -1,12 +1,107 @@
 import io
 import logging
-from typing import Optional
+import os
+from typing import List, Optional, Tuple
 
 import docx
 import fitz
 
 logging.basicConfig(level=logging.INFO)
 
+# Extracción paralela por rangos de páginas (gacetas grandes). Se activa si el PDF
+# supera cualquiera de los dos umbrales; con 1 worker se extrae siempre en serie.
+# El reparto lo hace solo `ExtractionExecutor` (services/extraction_executor.py), con
+# sus límites de procesos, memoria y tiempo: aquí no se crea ningún pool.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_PARALLEL_MIN_BYTES = int(os.getenv("PDF_PARALLEL_MIN_BYTES", str(8 * 1024 * 1024)))
+# Páginas mínimas por rango: por debajo, abrir el documento en otro proceso no compensa.
+PDF_PARALLEL_MIN_PAGES_PER_CHUNK = 16
+
+
+def _extract_page_range(file_bytes: bytes, start: int, stop: int) -> str:
+    """Extrae el texto de las páginas [start, stop)."""
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        return "".join(doc[i].get_text() for i in range(start, stop))
+
+
+def _page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    chunks = max(1, min(workers, page_count // PDF_PARALLEL_MIN_PAGES_PER_CHUNK))
+    size = -(-page_count // chunks)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _use_parallel_pdf(page_count: int, byte_size: int, workers: int) -> bool:
+    if workers < 2 or page_count < 2 * PDF_PARALLEL_MIN_PAGES_PER_CHUNK:
+        return False
+    return page_count >= PDF_PARALLEL_MIN_PAGES or byte_size >= PDF_PARALLEL_MIN_BYTES
+
+
+def pdf_page_ranges(file_bytes: bytes, workers: int) -> Optional[List[Tuple[int, int]]]:
+    """Rangos de páginas para repartir el PDF entre `workers` procesos; None si no supera los umbrales."""
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            if not _use_parallel_pdf(doc.page_count, len(file_bytes), workers):
+                return None
+            return _page_ranges(doc.page_count, workers)
+    except Exception:
+        return None
+
+
+def extract_pdf_page_range(file_bytes: bytes, start: int, stop: int) -> Optional[str]:
+    """Texto de las páginas [start, stop), o None si el PDF no se puede leer."""
+    try:
+        return _extract_page_range(file_bytes, start, stop)
+    except Exception as e:
+        logging.error(f"Error extrayendo páginas {start}-{stop}: {e}", exc_info=True)
+        return None
+
+
+# Pre-chequeo de PDFs escaneados: se muestrean unas pocas páginas antes de extraer todo.
+PDF_SCAN_SAMPLE_PAGES = int(os.getenv("PDF_SCAN_SAMPLE_PAGES", "5"))
+PDF_SCAN_MAX_CHARS_PER_PAGE = 25  # por debajo, la página no tiene capa de texto útil
+PDF_SCAN_MIN_IMAGE_COVERAGE = 0.6  # fracción del área de la página cubierta por imágenes
+
+
+def _sample_page_indexes(page_count: int, samples: int) -> List[int]:
+    """Índices repartidos a lo largo del documento (incluye primera y última página)."""
+    if page_count <= samples:
+        return list(range(page_count))
+    step = (page_count - 1) / (samples - 1)
+    return sorted({round(i * step) for i in range(samples)})
+
+
+def _image_coverage(page) -> float:
+    area = abs(page.rect) or 1.0
+    covered = 0.0
+    for info in page.get_image_info():
+        covered += abs(fitz.Rect(info["bbox"]) & page.rect)
+    return min(1.0, covered / area)
+
+
+def pdf_looks_scanned(file_bytes: bytes, samples: int = PDF_SCAN_SAMPLE_PAGES) -> bool:
+    """Indica si un PDF parece solo imágenes, mirando texto e imágenes de unas páginas de muestra.
+
+    Es conservador: solo devuelve True cuando las páginas muestreadas casi no tienen texto
+    y están mayormente cubiertas por imágenes. Ante la duda (o error) devuelve False y la
+    extracción completa decide.
+    """
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            indexes = _sample_page_indexes(doc.page_count, max(2, samples))
+            if not indexes:
+                return False
+            chars = 0
+            image_pages = 0
+            for i in indexes:
+                page = doc[i]
+                chars += len(page.get_text().strip())
+                if _image_coverage(page) >= PDF_SCAN_MIN_IMAGE_COVERAGE:
+                    image_pages += 1
+    except Exception as e:
+        logging.warning(f"No se pudo muestrear el PDF: {e}")
+        return False
+    return chars < PDF_SCAN_MAX_CHARS_PER_PAGE * len(indexes) and image_pages * 2 > len(indexes)
+
 
 def extract_text_from_bytes(file_bytes: bytes, filename: str, progress_callback=None, skip_ocr: bool = True) -> Optional[str]:
     """Extrae texto de PDF, DOCX o TXT.
@@ -17,11 +112,8 @@ def extract_text_from_bytes(file_bytes: bytes, filename: str, progress_callback=
     try:
         if filename.lower().endswith(".pdf"):
             logging.info(f"Processing PDF '{filename}' with PyMuPDF (OCR deshabilitado).")
-            text = []
             with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-                for page in doc:
-                    text.append(page.get_text())
-            joined = "".join(text).strip()
+                joined = "".join(page.get_text() for page in doc).strip()
             # Si es muy poco, devolver tal cual (el llamador decidirá si rechaza el PDF)
             return joined
         elif filename.lower().endswith(".docx"):
@@ -6,6 +6,9 @@ import os
 from dotenv import load_dotenv
 from tavily import TavilyClient
 
+from ..services.search_cache import TieredTTLCache, normalize_key
+from ..services.single_flight import SingleFlight
+
 MAX_CONTENT_SNIPPET_LENGTH = 2000
 
 try:
@@ -16,6 +19,41 @@ except KeyError:
     print("ADVERTENCIA: La variable de entorno TAVILY_API_KEY no está configurada.")
     tavily_client = None
 
+# Las mismas sentencias y leyes se consultan todo el día: cachear resultados de Tavily.
+search_cache = TieredTTLCache(
+    namespace="tavily",
+    ttl_s=float(os.getenv("TAVILY_CACHE_TTL_S", str(12 * 3600))),
+    max_entries=int(os.getenv("TAVILY_CACHE_MAX_ENTRIES", "512")),
+    redis_url=os.getenv("REDIS_URL") or None,
+)
+# Búsquedas idénticas simultáneas (mismo worker o entre workers) comparten una sola llamada a Tavily.
+search_flight = SingleFlight(search_cache, lock_ttl_s=45.0)
+
+
+def _buscar_en_tavily(final_query: str, cache_key: str) -> str:
+    """Ejecuta la búsqueda en Tavily y cachea la respuesta si es válida."""
+    print(f"--- Query final enviado a Tavily: '{final_query}' ---")
+
+    try:
+        response = tavily_client.search(
+            query=final_query, search_depth="advanced", max_results=5, include_raw_content=False, timeout=30  # Optimización: no necesitamos el contenido crudo si solo queremos el snippet
+        )
+
+        results = response.get("results", [])
+        if not results:
+            output = "No se encontraron resultados relevantes para la búsqueda especificada."
+        else:
+            # Devolvemos solo la información esencial para el LLM.
+            results_to_return = [{"url": r.get("url"), "title": r.get("title"), "snippet": r.get("content", "")[:MAX_CONTENT_SNIPPET_LENGTH]} for r in results]
+            output = json.dumps(results_to_return, ensure_ascii=False)
+
+        # Solo se cachean respuestas válidas; los errores se reintentan en la próxima llamada.
+        search_cache.set(cache_key, output)
+        return output
+
+    except Exception as e:
+        return f"Error al procesar la búsqueda en internet. El servicio devolvió el siguiente mensaje: {str(e)}"
+
 
 def buscar_documento_legal(query: str, tipo_documento: str, sitio_preferido: str = None) -> str:
     """
@@ -53,20 +91,10 @@ def buscar_documento_legal(query: str, tipo_documento: str, sitio_preferido: str
     if filetype:
         final_query += f" filetype:{filetype}"
 
-    print(f"--- Query final enviado a Tavily: '{final_query}' ---")
-
-    try:
-        response = tavily_client.search(
-            query=final_query, search_depth="advanced", max_results=5, include_raw_content=False, timeout=30  # Optimización: no necesitamos el contenido crudo si solo queremos el snippet
-        )
-
-        results = response.get("results", [])
-        if not results:
-            return "No se encontraron resultados relevantes para la búsqueda especificada."
+    cache_key = normalize_key(final_query, tipo_documento, sitio_preferido)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        print(f"--- Resultado desde caché para '{final_query}' ({search_cache.stats()}) ---")
+        return cached
 
-        # Devolvemos solo la información esencial para el LLM.
-        results_to_return = [{"url": r.get("url"), "title": r.get("title"), "snippet": r.get("content", "")[:MAX_CONTENT_SNIPPET_LENGTH]} for r in results]
-        return json.dumps(results_to_return, ensure_ascii=False)
-
-    except Exception as e:
-        return f"Error al procesar la búsqueda en internet. El servicio devolvió el siguiente mensaje: {str(e)}"
+    return search_flight.do(cache_key, lambda: _buscar_en_tavily(final_query, cache_key))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Benchmark: latencia de respuesta con recuperación local (BM25) vs. file_search.
+
+Sube un documento y hace las mismas preguntas por ambos caminos, midiendo
+preparación (indexar), tiempo al primer token y tiempo total por respuesta.
+
+Uso:
+  source venv/bin/activate
+  python benchmark_retrieval.py documento.pdf "¿Qué dice el artículo 5?" "¿Cuál es el objeto de la ley?"
+  python benchmark_retrieval.py documento.pdf "pregunta" --runs 3
+  python benchmark_retrieval.py documento.pdf "pregunta" --local-only   # sin llamadas a OpenAI
+
+Variables:
+  OPENAI_API_KEY y ASSISTANT_ID_CONSTITUCIONAL (salvo con --local-only).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from asistente_legal_constitucional_con_ia.services.local_retrieval import BM25Index, Passage, format_passages, tokenize
+from asistente_legal_constitucional_con_ia.services.upload_pipeline import upload_text_to_openai
+from asistente_legal_constitucional_con_ia.services.vector_store import add_files, create_session_vector_store, delete_vector_store
+from asistente_legal_constitucional_con_ia.util.legal_chunker import chunk_legal_text
+from asistente_legal_constitucional_con_ia.util.text_extraction import extract_text_from_bytes
+
+
+def timed_run(client, assistant_id, thread_id, content, tools):
+    """Envía `content` y consume el run en streaming: (s al primer token, s total)."""
+    start = time.perf_counter()
+    client.beta.threads.messages.create(thread_id=thread_id, role="user", content=content)
+    first_token = None
+    stream = client.beta.threads.runs.create(thread_id=thread_id, assistant_id=assistant_id, tools=tools, stream=True)
+    for event in stream:
+        if event.event == "thread.message.delta" and first_token is None:
+            first_token = time.perf_counter() - start
+        if event.event in ("thread.run.completed", "thread.run.failed", "thread.run.cancelled", "thread.run.expired"):
+            break
+    return first_token or float("nan"), time.perf_counter() - start
+
+
+def local_context(index, chunks, filename, question, k=6):
+    hits = index.search(question, k)
+    return format_passages([Passage(filename, chunks[i].heading, chunks[i].text.strip(), score) for i, score in hits])
+
+
+def summarize(label, samples):
+    firsts = [f for f, _ in samples]
+    totals = [t for _, t in samples]
+    print(f"  {label:<12} primer token p50={statistics.median(firsts):6.2f}s   total p50={statistics.median(totals):6.2f}s   (n={len(samples)})")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("documento")
+    parser.add_argument("preguntas", nargs="+")
+    parser.add_argument("--runs", type=int, default=1, help="repeticiones por pregunta y camino")
+    parser.add_argument("--local-only", action="store_true", help="medir solo la recuperación local, sin OpenAI")
+    args = parser.parse_args()
+
+    filename = os.path.basename(args.documento)
+    with open(args.documento, "rb") as f:
+        data = f.read()
+    t0 = time.perf_counter()
+    text = extract_text_from_bytes(data, filename)
+    if not text:
+        print("[ERROR] No se pudo extraer texto del documento.")
+        sys.exit(1)
+    extract_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    chunks = chunk_legal_text(text)
+    index = BM25Index([c.text for c in chunks])
+    index_s = time.perf_counter() - t0
+    search_times = []
+    for question in args.preguntas:
+        t0 = time.perf_counter()
+        index.search(question, 6)
+        search_times.append(time.perf_counter() - t0)
+    print(f"Documento: {filename} ({len(text)} caracteres, {len(tokenize(text))} tokens)")
+    print(f"  extracción            {extract_s * 1000:8.1f} ms")
+    print(f"  índice local          {index_s * 1000:8.1f} ms ({len(chunks)} fragmentos, {len(index.vocab)} términos)")
+    print(f"  búsqueda local p50    {statistics.median(search_times) * 1000:8.2f} ms")
+    if args.local_only:
+        return
+
+    from openai import OpenAI
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    assistant_id = os.environ.get("ASSISTANT_ID_CONSTITUCIONAL")
+    if not api_key or not assistant_id:
+        print("[ERROR] Faltan OPENAI_API_KEY o ASSISTANT_ID_CONSTITUCIONAL.")
+        sys.exit(1)
+    client = OpenAI(api_key=api_key)
+
+    file_id = vector_store_id = None
+    try:
+        t0 = time.perf_counter()
+        file_id = upload_text_to_openai(client, filename, text).id
+        vector_store_id = create_session_vector_store(client, "leyia-benchmark")
+        if not add_files(client, vector_store_id, [file_id]):
+            print("[ERROR] file_search no pudo indexar el documento.")
+            sys.exit(1)
+        remote_prep_s = time.perf_counter() - t0
+        print(f"  subida + indexación file_search {remote_prep_s:6.2f} s")
+
+        results = {"local": [], "file_search": []}
+        for question in args.preguntas:
+            for _ in range(args.runs):
+                thread = client.beta.threads.create()
+                context = local_context(index, chunks, filename, question)
+                content = f"{question}\n\n[Archivos adjuntos: {filename}]\n\n[Fragmentos relevantes de los documentos]\n{context}"
+                results["local"].append(timed_run(client, assistant_id, thread.id, content, tools=[]))
+
+                thread = client.beta.threads.create(tool_resources={"file_search": {"vector_store_ids": [vector_store_id]}})
+                content = f"{question}\n\n[Archivos adjuntos: {filename}]"
+                results["file_search"].append(timed_run(client, assistant_id, thread.id, content, tools=[{"type": "file_search"}]))
+        print("Latencia de respuesta:")
+        for label, samples in results.items():
+            summarize(label, samples)
+    finally:
+        if vector_store_id:
+            delete_vector_store(client, vector_store_id)
+        if file_id:
+            client.files.delete(file_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Verifica con EXPLAIN que las consultas de notebooks y transcripciones usan sus índices.
+
+Ejecuta EXPLAIN (FORMAT JSON) sobre las mismas consultas que hace la app
+(listado de notebooks, página siguiente por cursor, listado de transcripciones
+y transcripciones de un notebook) y comprueba que el plan usa el índice
+esperado (migración 7f3a9c2d1e64). Con tablas pequeñas Postgres prefiere un
+Seq Scan; en ese caso se repite con enable_seqscan=off para confirmar que el
+índice es utilizable.
+
+Uso:
+  source venv/bin/activate
+  python check_indexes.py
+  python check_indexes.py --workspace <user_id>
+
+Variables:
+  DATABASE_URL debe estar definida y apuntar a postgresql://
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+CHECKS = [
+    (
+        "Listado de notebooks",
+        "ix_notebook_workspace_id_updated_at",
+        "SELECT id, title, notebook_type, created_at, updated_at, substr(content, 1, 2000) FROM notebook "
+        "WHERE workspace_id = :ws ORDER BY updated_at DESC, id DESC LIMIT 21",
+    ),
+    (
+        "Notebooks: página siguiente (cursor)",
+        "ix_notebook_workspace_id_updated_at",
+        "SELECT id, title, notebook_type, created_at, updated_at, substr(content, 1, 2000) FROM notebook "
+        "WHERE workspace_id = :ws AND (updated_at < :cursor_at OR (updated_at = :cursor_at AND id < :cursor_id)) "
+        "ORDER BY updated_at DESC, id DESC LIMIT 21",
+    ),
+    (
+        "Listado de transcripciones",
+        "ix_audiotranscription_workspace_id_created_at",
+        "SELECT audiotranscription.* FROM audiotranscription "
+        "LEFT OUTER JOIN notebook ON audiotranscription.notebook_id = notebook.id "
+        "WHERE audiotranscription.workspace_id = :ws ORDER BY audiotranscription.created_at DESC",
+    ),
+    (
+        "Transcripciones de un notebook (delete_notebook)",
+        "ix_audiotranscription_notebook_id",
+        "SELECT * FROM audiotranscription WHERE notebook_id = :notebook_id",
+    ),
+]
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(conn, sql, params, force_index=False):
+    with conn.begin():
+        if force_index:
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+        raw = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return list(plan_nodes(plan[0]["Plan"]))
+
+
+def describe(nodes):
+    return " -> ".join(n["Node Type"] + (f" [{n['Index Name']}]" if "Index Name" in n else "") for n in nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspace", default="public", help="workspace_id usado en las consultas")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        print("[ERROR] DATABASE_URL no está definida.")
+        sys.exit(1)
+    if not url.startswith("postgresql://"):
+        print(f"[ERROR] EXPLAIN (FORMAT JSON) requiere Postgres: {url}")
+        sys.exit(1)
+    engine = create_engine(url, echo=False, future=True)
+    params = {"ws": args.workspace, "cursor_at": datetime.now(), "cursor_id": 2**31 - 1, "notebook_id": 1}
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, index_name, sql in CHECKS:
+            nodes = explain(conn, sql, params)
+            used = any(n.get("Index Name") == index_name for n in nodes)
+            status = "OK"
+            if not used:
+                # Tabla pequeña: el planner elige Seq Scan; confirmar que el índice es utilizable
+                nodes = explain(conn, sql, params, force_index=True)
+                used = any(n.get("Index Name") == index_name for n in nodes)
+                status = "OK (con enable_seqscan=off; tabla pequeña)" if used else "FALLA"
+            if not used:
+                failures += 1
+            sort = " + Sort" if any(n["Node Type"] == "Sort" for n in nodes) else ""
+            print(f"[{status}] {label}: {index_name}{sort}")
+            print(f"        {describe(nodes)}")
+
+    if failures:
+        print(f"[ERROR] {failures} consulta(s) no usan su índice. ¿Falta `alembic upgrade head`?")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()